@@ -15,6 +15,7 @@ User interaction involve:
     1 - Right Click: To revert a start, end or wall to a normal cell
     2 - Left Click: To designate a normal cell as wall cell
     3 - Buttons: Choosing the pathfinding algorithm, generating a maze or clearing the grid
+    4 - T Key: Turning turbo mode on or off, which shows only the result of an algorithm
     
 Note: After removing a start or end cell (by right click) user can reinstate
     them by left-clicking on any cell before starting an algorithm
@@ -25,13 +26,15 @@ Path Finding Algorithms used:
     3 - Bidirectional Search
     4 - Breadth-First Search (BFS)
     5 - Depth-First Search (DFS)
+    6 - Jump Point Search (JPS)
 """
 # Libraries ###################################################################
 import pygame
-from heapq import heapify, heappush, heappop
 import random
 import time
 
+import pathfinding
+
 # Variables ###################################################################
 WIN_WIDTH = 1300
 WIN_HEIGHT = 680
@@ -44,6 +47,7 @@ GRID_WIDTH = WIN_WIDTH - (GRID_LEFT_BUFFER + GRID_RIGHT_BUFFER)
 GRID_HEIGHT = WIN_HEIGHT - (GRID_TOP_BUFFER + GRID_BOTTOM_BUFFER)
 
 GRID_ROWS = 29 # Suggested Values - 29, 58, 116, 145, 290
+DIAGONAL_MOVEMENT = False # True - 8-connected movement without cutting corners
 
 BLACK = pygame.Color(0, 0, 0)
 WHITE = pygame.Color(255, 255, 255) # Background
@@ -68,17 +72,41 @@ LIGHT_GREEN_1 = pygame.Color(128, 237, 153) # BFS button
 LIGHT_GREEN_2 = pygame.Color(166, 242, 184) # BFS button
 TEA_GREEN = pygame.Color(199, 249, 204) # DFS button
 DARK__TEA_GREEN = pygame.Color(24, 231, 45) # DFS button
-
-PAUSE_TIME = 0.01
+MINT = pygame.Color(152, 222, 217) # JPS button
+LIGHT_MINT = pygame.Color(192, 236, 232) # JPS button
+
+MAZE_GENERATOR = "recursive_division" # Also "prim", "kruskal" or "caves"
+
+# Search speed: every frame runs the search for STEPS_PER_FRAME steps (e.g. 1
+# to follow every step) but at most for FRAME_BUDGET seconds. By default the
+# steps per frame grow with the grid, so a search through the whole grid is
+# animated for about SEARCH_SECONDS on any grid size the budget allows. Turbo
+# mode, toggled with the T key, runs a search to the end in a single frame
+# and only shows the result.
+FPS = 60
+FRAME_BUDGET = 0.008
+STEPS_PER_FRAME = None
+SEARCH_SECONDS = 5
+TURBO_MODE = False
+
+# Screen areas of the header (buttons and legend) and of the grid with its lines
+HEADER_RECT = pygame.Rect(0, 0, WIN_WIDTH, GRID_TOP_BUFFER)
+GRID_RECT = pygame.Rect(GRID_LEFT_BUFFER, GRID_TOP_BUFFER, GRID_WIDTH + 1, GRID_HEIGHT + 1)
+
+# Above this many changed cells one update of the whole grid is cheaper than
+# one update per cell
+MAX_DIRTY_RECTS = 1000
 
 # Initial pygame Setup ########################################################
 pygame.init()
 pygame.display.set_caption("Path Finding Algorithms")
-WIN = pygame.display.set_mode((WIN_WIDTH, WIN_HEIGHT))
 CLOCK = pygame.time.Clock()
 
 # Button Class ################################################################
 class Button:
+    __slots__ = ("x", "y", "width", "height", "text_surface", "border_radius", "primary_color",
+                 "dual_color", "secondary_color", "button_rect", "clicked", "faces", "hovered", "redrawn")
+    
     def __init__(self, x, y, width, height, text_surface=None, border_radius=0, color="white"):
         self.x = x
         self.y = y
@@ -93,19 +121,42 @@ class Button:
         self.button_rect = pygame.Rect((self.x, self.y), (self.width, self.height))
         self.button_rect.topleft = (self.x, self.y)
         self.clicked = False
+        
+        # Faces without and with the mouse over the button, rendered once
+        self.faces = None
+        # Hover state of the face on the surface, None if it was drawn over
+        self.hovered = None
+        # Set when the face was drawn, for the caller to update the screen
+        self.redrawn = False
     
     def set_primary_button_color(self, primary_color):
         self.primary_color = primary_color
+        self.faces = None
     
     def set_secondary_button_color(self, secondary_color):
         self.dual_color = True
         self.secondary_color = secondary_color
+        self.faces = None
     
     def add_text(self, text_surface):
         self.text_surface = text_surface
+        self.faces = None
     
     def set_border_radius(self, border_radius):
         self.border_radius = border_radius
+        self.faces = None
+    
+    def get_faces(self):
+        if self.faces is None:
+            self.faces = []
+            for color in (self.primary_color, self.secondary_color if self.dual_color else self.primary_color):
+                # The corners outside the border radius stay transparent
+                face = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
+                pygame.draw.rect(face, color, face.get_rect(), border_radius=self.border_radius)
+                if self.text_surface:
+                    face.blit(self.text_surface, self.text_surface.get_rect(center=face.get_rect().center))
+                self.faces.append(face)
+        return self.faces
     
     def draw(self, surface):
         action = False
@@ -114,12 +165,8 @@ class Button:
         mouse_pos = pygame.mouse.get_pos()
         
         # Check if mouse is over the button
-        if self.button_rect.collidepoint(mouse_pos):
-            if self.dual_color:
-                pygame.draw.rect(surface, self.secondary_color, self.button_rect, border_radius=self.border_radius)
-            else:
-                pygame.draw.rect(surface, self.primary_color, self.button_rect, border_radius=self.border_radius)
-            
+        hovered = self.button_rect.collidepoint(mouse_pos)
+        if hovered:
             # Left Click
             if pygame.mouse.get_pressed()[0] and not self.clicked:
                 # To register the click only once
@@ -130,463 +177,228 @@ class Button:
             # To register the click only once
             if not pygame.mouse.get_pressed()[0]:
                 self.clicked = False
-        # If mouse is not over button
-        else:
-            pygame.draw.rect(surface, self.primary_color, self.button_rect, border_radius=self.border_radius)
         
-        # Check if pygame surface for text is provided
-        if self.text_surface:
-            centered_text_rect = self.text_surface.get_rect(center=self.button_rect.center)
-            surface.blit(self.text_surface, centered_text_rect)
+        # The face is only drawn again when the hover state changed
+        if hovered != self.hovered:
+            self.hovered = hovered
+            surface.blit(self.get_faces()[hovered], self.button_rect)
+            self.redrawn = True
         
         return action
 
+# Cell States #################################################################
+# A cell is in exactly one of these states at a time
+STATE_START = 0
+STATE_END = 1
+STATE_WALL = 2
+STATE_VISITED = 3
+STATE_UNVISITED = 4
+STATE_IN_QUEUE = 5
+STATE_PATH = 6
+STATE_NO_PATH = 7
+
+STATE_COLORS = (GREEN, RED, DARK_SLATE_GRAY, LIGHT_GRAY, WHITE, DODGER_BLUE, GOLD, DARK_ORANGE_RED)
+
 # Cell Class ##################################################################
 class Cell:
-    def __init__(self, row, col, size, total_rows, total_cols, is_sizeXsize=True):
+    __slots__ = ("row", "col", "size", "x", "y", "color", "total_rows", "total_cols",
+                 "is_sizeXsize", "store", "state", "rect")
+    
+    def __init__(self, row, col, size, total_rows, total_cols, is_sizeXsize=True, store=None):
         self.row = row
         self.col = col
         self.size = size
         self.x = col * size + GRID_LEFT_BUFFER
         self.y = row * size + GRID_TOP_BUFFER
         self.color = WHITE
-        self.neighbors = []
         self.total_rows = total_rows
         self.total_cols = total_cols
-        self.is_sizeXsize = True
-        self.cell_properties = {
-                                "start": False,
-                                "end": False,
-                                "wall": False,
-                                "visited": False,
-                                "unvisited": True,
-                                "in_queue": False,
-                                "path": False,
-                                "no_path": False
-                                }
-    
-    # Only one property of cell can be True at a time
-    def _manage_cell_property(current_cell_property, cell_properties):
-        if current_cell_property not in cell_properties:
-            print("Cell Property not found")
-            return False
-        
-        for cell_property in cell_properties:
-            cell_properties[cell_property] = False
-        
-        cell_properties[current_cell_property] = True
-        return cell_properties
+        self.is_sizeXsize = is_sizeXsize
+        # Compact grid store the searches run against
+        self.store = store
+        self.state = STATE_UNVISITED
+        
+        # Area inside the grid lines, the lines themselves are on the cached
+        # background and never drawn over. The partial last column has no
+        # line on its left and ends at the right grid line.
+        left = self.x + 1 if is_sizeXsize else self.x
+        right = min(self.x + size, WIN_WIDTH - GRID_RIGHT_BUFFER)
+        self.rect = pygame.Rect(left, self.y + 1, right - left, size - 1)
+    
+    def _set_state(self, state):
+        # Keep the wall flag of the grid store in sync with the cell
+        if self.store is not None and (state == STATE_WALL) != (self.state == STATE_WALL):
+            self.store.set_wall((self.row, self.col), state == STATE_WALL)
+        self.state = state
+        if self.color != STATE_COLORS[state]:
+            self.color = STATE_COLORS[state]
+            dirty_cells.add(self)
     
     def get_position(self):
         return self.row, self.col
     
     def is_start(self):
-        return self.cell_properties["start"]
+        return self.state == STATE_START
     
     def is_end(self):
-        return self.cell_properties["end"]
+        return self.state == STATE_END
     
     def is_wall(self):
-        return self.cell_properties["wall"]
+        return self.state == STATE_WALL
     
     def is_visited(self):
-        return self.cell_properties["visited"]
+        return self.state == STATE_VISITED
     
     def is_unvisited(self):
-        return self.cell_properties["unvisited"]
+        return self.state == STATE_UNVISITED
     
     def is_in_queue(self):
-        return self.cell_properties["in_queue"]
+        return self.state == STATE_IN_QUEUE
     
     def is_path(self):
-        return self.cell_properties["path"]
+        return self.state == STATE_PATH
     
     def is_no_path(self):
-        return self.cell_properties["no_path"]
+        return self.state == STATE_NO_PATH
     
     def set_start(self):
-        if not self.is_end():
-            self.cell_properties = Cell._manage_cell_property("start", self.cell_properties)
-            self.color = GREEN
+        if self.state != STATE_END:
+            self._set_state(STATE_START)
     
     def set_end(self):
-        if not self.is_start():
-            self.cell_properties = Cell._manage_cell_property("end", self.cell_properties)
-            self.color = RED
+        if self.state != STATE_START:
+            self._set_state(STATE_END)
     
     def set_wall(self):
-        if not self.is_start() and not self.is_end():
-            self.cell_properties = Cell._manage_cell_property("wall", self.cell_properties)
-            self.color = DARK_SLATE_GRAY
+        if self.state != STATE_START and self.state != STATE_END:
+            self._set_state(STATE_WALL)
     
     def set_visited(self):
-        self.cell_properties = Cell._manage_cell_property("visited", self.cell_properties)
-        self.color = LIGHT_GRAY
+        self._set_state(STATE_VISITED)
     
     def set_unvisited(self):
-        self.cell_properties = Cell._manage_cell_property("unvisited", self.cell_properties)
-        self.color = WHITE
+        self._set_state(STATE_UNVISITED)
     
     def set_in_queue(self):
-        self.cell_properties = Cell._manage_cell_property("in_queue", self.cell_properties)
-        self.color = DODGER_BLUE
+        self._set_state(STATE_IN_QUEUE)
     
     def set_path(self):
-        self.cell_properties = Cell._manage_cell_property("path", self.cell_properties)
-        self.color = GOLD
+        self._set_state(STATE_PATH)
     
     def set_no_path(self):
-        self.cell_properties = Cell._manage_cell_property("no_path", self.cell_properties)
-        self.color = DARK_ORANGE_RED
+        self._set_state(STATE_NO_PATH)
     
     def reset(self):
-        self.cell_properties = Cell._manage_cell_property("unvisited", self.cell_properties)
-        self.color = WHITE
-        
-    def update_neighbors(self, grid):
-        self.neighbors = []
-        
-        # Check Up
-        if self.row > 0 and not grid[self.row - 1][self.col].is_wall():
-            self.neighbors.append(grid[self.row - 1][self.col])
-        
-        # Check Down
-        if self.row < self.total_rows - 1 and not grid[self.row + 1][self.col].is_wall():
-            self.neighbors.append(grid[self.row + 1][self.col])
-        
-        # Check Left
-        if self.col > 0 and not grid[self.row][self.col - 1].is_wall():
-            self.neighbors.append(grid[self.row][self.col - 1])
-        
-        # Check Right
-        if self.col < self.total_cols - 1 and not grid[self.row][self.col + 1].is_wall():
-            self.neighbors.append(grid[self.row][self.col + 1])
+        self._set_state(STATE_UNVISITED)
     
     def draw(self, win):
-        if self.is_sizeXsize:
-            pygame.draw.rect(win, self.color, (self.x, self.y, self.size, self.size))
-        else:
-            pygame.draw.rect(win, self.color, (self.x, self.y, WIN_WIDTH - GRID_RIGHT_BUFFER, self.size))
+        return win.fill(self.color, self.rect)
     
     def __lt__(self, other):
         return False
 
-# Dijkstra's Algorithm ########################################################
-def dijkstra_algorithm(draw, grid, start, end):
-    node_data = {}
-    
-    for row in grid:
-        for cell in row:
-            node_data[cell] = {'cost': float("inf"), 'previous': []}
-    
-    node_data[start]['cost'] = 0
-    visited_nodes = set()
+# Path Finding Algorithms #####################################################
+# The searches themselves live in the headless pathfinding engine and run
+# against the grid store shared by the cells. The functions below return the
+# search as a generator of (event, position) pairs, which main() runs a frame
+# at a time with run_search_frame. The generator returns True if a path was
+# found.
+def run_search_algorithm(algorithm, grid, start, end, **options):
+    # End cells in another component than the start can't be reached, which
+    # is known without animating a search through the whole start component
+    if not get_grid_components(grid).connected(start.get_position(), end.get_position()):
+        return False
     
-    queue = []
-    heappush(queue, (node_data[start]['cost'], start))
+    store = get_grid_store(grid)
+    result = yield from pathfinding.search_steps(store, start.get_position(), end.get_position(), algorithm, **options)
     
-    while queue:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-               pygame.quit()
-        
-        heapify(queue)
-        current = heappop(queue)[1]
-        
-        if current == end:
-            path = node_data[end]['previous']
-            path.append(end)
-            draw_path(draw, start, end, path)
-            return True
-        
-        if current not in visited_nodes:
-            visited_nodes.add(current)
-            if current != start:
-                current.set_visited()
-            
-            for neighbor in current.neighbors:
-                if neighbor not in visited_nodes:
-                    # cost = cost till now + cost to reach that neighbor
-                    cost = node_data[current]['cost'] + 1
-                    if cost < node_data[neighbor]['cost']:
-                        node_data[neighbor]['cost'] = cost
-                        node_data[neighbor]['previous'] = node_data[current]['previous'].copy()
-                        node_data[neighbor]['previous'].append(current)
-                    heappush(queue, (node_data[neighbor]['cost'], neighbor))
-                    neighbor.set_in_queue()
-        
-        draw()
-        time.sleep(PAUSE_TIME)
-    return False
+    # The path is drawn one cell per step
+    for position in result.path:
+        yield "path", position
+        yield "step", None
+    return result.found
 
-# A* Search Algorithm #########################################################
-def heuristic_function(p1, p2):
-    # Using Manhattan Distance
-    x1, y1 = p1
-    x2, y2 = p2
-    return abs(x1 - x2) + abs(y1 - y2)
+def dijkstra_algorithm(grid, start, end):
+    return run_search_algorithm("dijkstra", grid, start, end)
 
-def construct_path(previous, current, start):
-    # Constructing a list which shows path from Start to End
-    path = [current]
-    
-    while current != start:
-        current = previous[current]
-        current.set_path()
-        path.append(current)
-    
-    path.reverse()
-    return path
+def a_star_search_algorithm(grid, start, end, heuristic=None):
+    # heuristic may be a heuristic name or e.g. pathfinding.Landmarks of the store
+    return run_search_algorithm("a_star", grid, start, end, heuristic=heuristic)
 
-def a_star_search_algorithm(draw, grid, start, end):
-    g_score = {cell: float("inf") for row in grid for cell in row}
-    g_score[start] = 0
-    
-    h_score = heuristic_function(start.get_position(), end.get_position())
-    
-    f_score = {cell: float("inf") for row in grid for cell in row}
-    f_score[start] = g_score[start] + h_score
-    
-    queue = []
-    heapify(queue)
-    heappush(queue, (0, h_score, start))
-    previous = {}
-    
-    while queue:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-               pygame.quit()
-        
-        current = heappop(queue)[2]
-        
-        if current != start:
-            current.set_visited()
-        
-        if current == end:
-            path = construct_path(previous, current, start)
-            draw_path(draw, start, end, path)
-            return True
-        
-        for neighbor in current.neighbors:
-            # temp_g_score = current_g_score + score_to_reach_neighbor
-            temp_g_score = g_score[current] + 1
-            
-            if temp_g_score < g_score[neighbor]:
-                g_score[neighbor] = temp_g_score
-                previous[neighbor] = current
-                h_score = heuristic_function(neighbor.get_position(), end.get_position())
-                f_score[neighbor] = g_score[neighbor] + h_score
-                
-                if neighbor not in queue:
-                    heappush(queue, (f_score[neighbor], h_score, neighbor))
-                    neighbor.set_in_queue()
-        
-        draw()
-        time.sleep(PAUSE_TIME)
-    return False
+def bidirectional_search_algorithm(grid, start, end):
+    return run_search_algorithm("bidirectional", grid, start, end)
 
-# Bidirectional Search Algorithm ##############################################
-def bidirectional_search_algorithm(draw, grid, start, end):
-    start_queue = [start]
-    end_queue = [end]
-    
-    start_visited = set()
-    end_visited = set()
-    
-    start_prev_node = {}
-    for row in grid:
-        for cell in row:
-            start_prev_node[cell] = []
-    end_prev_node = {}
-    for row in grid:
-        for cell in row:
-            end_prev_node[cell] = []
-    
-    intersection = ""
-    
-    while start_queue and end_queue:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-               pygame.quit()
-        
-        start_current = start_queue.pop(0)
-        if start_current not in start_visited:
-            start_visited.add(start_current)
-            if start_current != start:
-                start_current.set_visited()
-            
-            for neighbor in start_current.neighbors:
-                if neighbor not in start_visited:
-                    start_queue.append(neighbor)
-                    if neighbor != start or neighbor != end:
-                        neighbor.set_in_queue()
-                    start_prev_node[neighbor] = start_prev_node[start_current].copy()
-                    start_prev_node[neighbor].append(start_current)
-                    if neighbor in end_visited:
-                        intersection = neighbor
-                        break
-        
-        if intersection:
-            break
-        
-        end_current = end_queue.pop(0)
-        if end_current not in end_visited:
-            end_visited.add(end_current)
-            if end_current != end:
-                end_current.set_visited()
-            for neighbor in end_current.neighbors:
-                if neighbor not in end_visited:
-                    end_queue.append(neighbor)
-                    if neighbor != start or neighbor != end:
-                        neighbor.set_in_queue()
-                    end_prev_node[neighbor] = end_prev_node[end_current].copy()
-                    end_prev_node[neighbor].append(end_current)
-                    if neighbor in start_visited:
-                        intersection = neighbor
-                        break
-        
-        if intersection:
-            break
-        draw()
-        time.sleep(PAUSE_TIME)
-    
-    if intersection:
-        path = start_prev_node[intersection].copy()
-        path.append(intersection)
-        path.extend(end_prev_node[intersection])
-        draw_path(draw, start, end, path)
-        return True
-    return False
+def BFS_algorithm(grid, start, end):
+    return run_search_algorithm("bfs", grid, start, end)
 
-# Breadth-First Search (BFS) Algorithm ########################################
-def BFS_algorithm(draw, grid, start, end):
-    visited_nodes = set()
-    queue = [start]
-    prev_node = {}
-    
-    for row in grid:
-        for cell in row:
-            prev_node[cell] = []
-    
-    while queue:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-               pygame.quit()
-        
-        current = queue.pop(0)
-        
-        if current not in visited_nodes:
-            visited_nodes.add(current)
-            if current == end:
-                path = prev_node[end]
-                draw_path(draw, start, end, path)
-                return True
-            if current != start:
-                current.set_visited()
-            
-            for neighbor in current.neighbors:
-                if neighbor not in visited_nodes:
-                    queue.append(neighbor)
-                    prev_node[neighbor] = prev_node[current].copy()
-                    prev_node[neighbor].append(current)
-                    if neighbor != end:
-                        neighbor.set_in_queue()
-        
-        draw()
-        time.sleep(PAUSE_TIME)
-        if len(queue) == 0:
-            return False
-    return False
+def DFS_algorithm(grid, start, end):
+    return run_search_algorithm("dfs", grid, start, end)
 
-# Depth-First Search (DFS) Algorithm ##########################################
-def depth_first_search(draw, grid, visited_nodes, start, end, current, prev_node):
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-           pygame.quit()
-    
-    if current not in visited_nodes:
-        visited_nodes.add(current)
-        if current != start:
-            current.set_visited()
-        
-        for neighbor in current.neighbors:
-            if neighbor not in visited_nodes:
-                prev_node[neighbor] = prev_node[current].copy()
-                prev_node[neighbor].append(current)
-                if neighbor == end:
-                    return True
-                neighbor.set_in_queue()
-                draw()
-                time.sleep(PAUSE_TIME)
-                if depth_first_search(draw, grid, visited_nodes, start, end, neighbor, prev_node):
-                    return True
-    return False
+def jump_point_search_algorithm(grid, start, end):
+    return run_search_algorithm("jps", grid, start, end)
 
-def DFS_algorithm(draw, grid, start, end):
-    
-    visited_nodes = set()
-    prev_node = {}
-    for row in grid:
-        for cell in row:
-            prev_node[cell] = []
-    depth_first_search(draw, grid, visited_nodes, start, end, start, prev_node)
-    
-    if prev_node[end]:
-        path = prev_node[end].copy()
-        draw_path(draw, start, end, path)
-        return True
-    return False
+# Search Scheduler ############################################################
+def apply_search_event(grid, start, end, event, position):
+    cell = grid[position[0]][position[1]]
+    if event == "path":
+        if cell == start:
+            cell.set_start()
+        elif cell == end:
+            cell.set_end()
+        else:
+            cell.set_path()
+    elif cell == start or cell == end:
+        return
+    elif event == "visited":
+        cell.set_visited()
+    elif event == "in_queue":
+        cell.set_in_queue()
+
+def get_steps_per_frame(grid):
+    if STEPS_PER_FRAME:
+        return STEPS_PER_FRAME
+    return max(1, len(grid) * len(grid[0]) // (SEARCH_SECONDS * FPS))
+
+def run_search_frame(search, grid, start, end, turbo=False):
+    # Runs the search for one frame: for get_steps_per_frame() steps unless
+    # FRAME_BUDGET is used up first, or to the end in turbo mode.
+    # Returns None while the search is not done, else True if a path was found.
+    deadline = time.perf_counter() + FRAME_BUDGET
+    steps_per_frame = get_steps_per_frame(grid)
+    steps = 0
+    while True:
+        try:
+            event, position = next(search)
+        except StopIteration as stop:
+            return stop.value
+        
+        if event != "step":
+            apply_search_event(grid, start, end, event, position)
+        elif not turbo:
+            steps += 1
+            if steps >= steps_per_frame or time.perf_counter() >= deadline:
+                return None
 
 # Random Maze Generator #######################################################
-def recursive_division(x, y, width, height, grid, draw, horizontal):
-    # Generate Random Maze using recursive division
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-           pygame.quit()
+# The maze is generated by the pathfinding engine straight into the grid
+# store, the cells then take their walls from the store
+def generate_random_maze(grid, start, end, seed=None):
+    store = get_grid_store(grid)
+    pathfinding.generate_maze(store, MAZE_GENERATOR, seed)
     
-    if width < 3 or height < 3:
-        return
-
-    if horizontal:
-        wall_y = random.randint(y + 1, y + height - 2)
-        for col in range(x, x + width):
-            grid[wall_y][col-1].set_wall()
-        gap_x = random.randint(x, x + width - 3)
-        grid[wall_y][gap_x].set_unvisited()
-        draw()
-        time.sleep(PAUSE_TIME)
-        
-        recursive_division(x, y, width, wall_y - y, grid, draw, not horizontal)
-        recursive_division(x, wall_y + 1, width, y + height - wall_y - 1, grid, draw, not horizontal)
-    else:
-        wall_x = random.randint(x + 1, x + width - 2)
-        for row in range(y, y + height):
-            grid[row-1][wall_x].set_wall()
-        gap_y = random.randint(y, y + height - 3)
-        grid[gap_y][wall_x].set_unvisited()
-        draw()
-        time.sleep(PAUSE_TIME)
-
-        recursive_division(x, y, wall_x - x, height, grid, draw, not horizontal)
-        recursive_division(wall_x + 1, y, x + width - wall_x - 1, height, grid, draw, not horizontal)
-    return
-
-def generate_random_maze(x, y, width, height, grid, draw):
-    horizontal = random.choice([True, False])
-    for cell in grid[0]:
-        cell.set_wall()
-        draw()
-    for row in range(height):
-        grid[row][0].set_wall()
-        draw()
-    for cell in grid[height - 1]:
-        cell.set_wall()
-        draw()
-    for row in range(height):
-        grid[row][width - 1].set_wall()
-        draw()
-    recursive_division(1, 1, width-1, height-1, grid, draw, horizontal)
-    return
+    # Start and end stay free
+    for cell in (start, end):
+        if cell:
+            store.set_wall(cell.get_position(), False)
+    
+    for row in grid:
+        for cell in row:
+            if cell == start or cell == end:
+                continue
+            if store.is_wall(cell.get_position()):
+                cell.set_wall()
+            else:
+                cell.set_unvisited()
 
 # Grid Functions ##############################################################
 def generate_grid(rows, grid_width, grid_height):
@@ -594,19 +406,42 @@ def generate_grid(rows, grid_width, grid_height):
     cell_size = grid_height // rows
     cols = grid_width // cell_size
     
+    # The cells only hold what is needed to draw them, the walls are kept in
+    # the compact grid store which the search algorithms run against
+    partial_col = grid_width % cell_size != 0
+    store = pathfinding.Grid(rows, cols + 1 if partial_col else cols, diagonal=DIAGONAL_MOVEMENT)
+    
     for i in range(rows):
         grid.append([])
         for j in range(cols):
-            cell = Cell(i, j, cell_size, rows, cols)
+            cell = Cell(i, j, cell_size, rows, cols, store=store)
             grid[i].append(cell)
     
-    if grid_width % cell_size != 0:
+    if partial_col:
         for i in range(rows):
-            cell = Cell(i, cols, cell_size, rows, cols, is_sizeXsize=False)
+            cell = Cell(i, cols, cell_size, rows, cols, is_sizeXsize=False, store=store)
             grid[i].append(cell)
     
     return grid
 
+def get_grid_store(grid):
+    return grid[0][0].store
+
+# Cells whose color changed since they were last drawn
+dirty_cells = set()
+
+# Background surface with the grid lines for each row count
+grid_backgrounds = {}
+
+# Connected components of each grid store, kept up to date by the store
+grid_components = {}
+
+def get_grid_components(grid):
+    store = get_grid_store(grid)
+    if store not in grid_components:
+        grid_components[store] = pathfinding.ComponentIndex(store)
+    return grid_components[store]
+
 def draw_grid_lines(win, rows, grid_width, grid_height):
     cell_size = grid_height // rows
     
@@ -619,24 +454,44 @@ def draw_grid_lines(win, rows, grid_width, grid_height):
     
     for i in range(cols):
         pygame.draw.line(win, DARK_SLATE_GRAY, ((i*cell_size) + GRID_LEFT_BUFFER, GRID_TOP_BUFFER), ((i*cell_size) + GRID_LEFT_BUFFER, WIN_HEIGHT - GRID_BOTTOM_BUFFER))
-        
-    pygame.draw.line(win, DARK_SLATE_GRAY, (WIN_WIDTH - GRID_RIGHT_BUFFER, GRID_TOP_BUFFER), (WIN_WIDTH - GRID_RIGHT_BUFFER, WIN_HEIGHT - GRID_BOTTOM_BUFFER))
     
-def draw_grid(win, grid, rows, grid_width, grid_height):
-    # win.fill(WHITE)
-    for row in grid:
-        for cell in row:
-            cell.draw(win)
+    pygame.draw.line(win, DARK_SLATE_GRAY, (WIN_WIDTH - GRID_RIGHT_BUFFER, GRID_TOP_BUFFER), (WIN_WIDTH - GRID_RIGHT_BUFFER, WIN_HEIGHT - GRID_BOTTOM_BUFFER))
+
+def get_grid_background(rows, grid_width, grid_height):
+    # Empty grid with its lines, rendered once per grid size
+    if rows not in grid_backgrounds:
+        background = pygame.Surface((WIN_WIDTH, WIN_HEIGHT))
+        background.fill(WHITE)
+        draw_grid_lines(background, rows, grid_width, grid_height)
+        grid_backgrounds[rows] = background
+    return grid_backgrounds[rows]
+
+def draw_grid(win, grid, rows, grid_width, grid_height, full=False):
+    # Only the cells whose color changed since the last frame are drawn and
+    # sent to the screen. full=True draws the whole grid over its background.
+    if full:
+        win.blit(get_grid_background(rows, grid_width, grid_height), GRID_RECT, GRID_RECT)
+        for row in grid:
+            for cell in row:
+                if cell.color != WHITE:
+                    cell.draw(win)
+        dirty_cells.clear()
+        pygame.display.update(GRID_RECT)
+        return
     
-    draw_grid_lines(win, rows, grid_width, grid_height)
-    pygame.display.update()
+    if not dirty_cells:
+        return
+    rects = [cell.draw(win) for cell in dirty_cells]
+    if len(dirty_cells) > MAX_DIRTY_RECTS:
+        pygame.display.update(GRID_RECT)
+    else:
+        pygame.display.update(rects)
+    dirty_cells.clear()
 
 def reset_grid(grid):
     for row in grid:
         for cell in row:
             cell.set_unvisited()
-    
-    pygame.display.update()
 
 def click_in_grid(click_pos):
     x, y = click_pos
@@ -644,7 +499,7 @@ def click_in_grid(click_pos):
         # Mouse clicked inside the grid
         return True
     return False
-    
+
 def get_clicked_cell(click_pos, rows, grid_width, grid_height):
     cell_size = grid_height // rows
     x, y = click_pos
@@ -653,16 +508,6 @@ def get_clicked_cell(click_pos, rows, grid_width, grid_height):
     col = (x - GRID_LEFT_BUFFER) // cell_size
     return row, col
 
-def draw_path(draw, start, end, path):
-    for cell in path:
-        if cell == start:
-            cell.set_start()
-        elif cell == end:
-            cell.set_end()
-        else:
-            cell.set_path()
-        draw()
-
 def draw_path_not_found(win, draw, grid, rows, grid_width, grid_height):
     # win.fill(WHITE)
     
@@ -687,17 +532,14 @@ def draw_path_not_found(win, draw, grid, rows, grid_width, grid_height):
                     cell.set_no_path()
         draw()
         time.sleep(0.6)
-    
-    draw_grid_lines(win, rows, grid_width, grid_height)
-    pygame.display.update()
 
 # Buttons #####################################################################
 # Values for Window Size = 1300X680 and Grid Size = 1280X580
 spacing = 5
-button_width = 180
+button_width = 156
 button_height = 45
 button_radius = 30
-button_font = pygame.font.SysFont("Georgia", 15, bold=False, italic=False)
+button_font = pygame.font.SysFont("Georgia", 13, bold=False, italic=False)
 
 # Algorithm Buttons
 dijkstra_surf = button_font.render("Dijkstra's Algorithm", True, BLACK)
@@ -720,76 +562,95 @@ dfs_surf = button_font.render("Depth-First Search", True, BLACK)
 dfs_button = Button((5*spacing) + (4*button_width), 5, button_width, button_height, text_surface=dfs_surf, border_radius=button_radius, color=TEA_GREEN)
 dfs_button.set_secondary_button_color(DARK__TEA_GREEN)
 
+jps_surf = button_font.render("Jump Point Search", True, BLACK)
+jps_button = Button((6*spacing) + (5*button_width), 5, button_width, button_height, text_surface=jps_surf, border_radius=button_radius, color=MINT)
+jps_button.set_secondary_button_color(LIGHT_MINT)
+
 # Clear Button
 clear_surf = button_font.render("CLEAR", True, BLACK)
-clear_button = Button((6*spacing) + (5*button_width), 5, button_width, button_height, text_surface=clear_surf, border_radius=button_radius, color=RED)
+clear_button = Button((7*spacing) + (6*button_width), 5, button_width, button_height, text_surface=clear_surf, border_radius=button_radius, color=RED)
 clear_button.set_secondary_button_color(LIGHT_RED)
 
 # Random Maze Button
 maze_surf = button_font.render("Generate Random Maze", True, BLACK)
-maze_button = Button((7*spacing) + (6*button_width), 5, button_width, button_height, text_surface=maze_surf, border_radius=button_radius, color=ORANGE)
+maze_button = Button((8*spacing) + (7*button_width), 5, button_width, button_height, text_surface=maze_surf, border_radius=button_radius, color=ORANGE)
 maze_button.set_secondary_button_color(LIGHT_ORANGE)
 
+# All buttons of the toolbar
+buttons = (dijkstra_button, a_star_button, bidirectional_button, bfs_button, dfs_button, jps_button,
+           clear_button, maze_button)
+
 # Helper Functions ############################################################
-def update_cell_neighbors(grid):
-    for row in grid:
-        for cell in row:
-            cell.update_neighbors(grid)
-    return
+legend_font = pygame.font.SysFont("Georgia", 20, bold=False, italic=False)
 
-def draw_stationary_objects(win):
-    pygame.draw.rect(win, DARK_SLATE_GRAY, (0, 0, WIN_WIDTH, 55))
-    
-    # Algorithm buttons
-    dijkstra_button.draw(win)
-    a_star_button.draw(win)
-    bidirectional_button.draw(win)
-    bfs_button.draw(win)
-    dfs_button.draw(win)
-    
-    # Clear button
-    clear_button.draw(win)
-    
-    # Generate Random Maze button
-    maze_button.draw(win)
+# Toolbar and legend without the buttons, rendered once by get_header_surface
+header_surface = None
+
+def render_header():
+    header = pygame.Surface(HEADER_RECT.size)
+    header.fill(WHITE)
+    pygame.draw.rect(header, DARK_SLATE_GRAY, (0, 0, WIN_WIDTH, 55))
     
     # Legend
     # Values for Window Size = 1300X680 and Grid Size = 1280X580
     cube_size = 25
     spacing = 5
-    legend_font = pygame.font.SysFont("Georgia", 20, bold=False, italic=False)
     
     # Legend - Start
-    pygame.draw.rect(win, GREEN, (GRID_LEFT_BUFFER + 20, GRID_TOP_BUFFER - (cube_size + 5), cube_size, cube_size))
+    pygame.draw.rect(header, GREEN, (GRID_LEFT_BUFFER + 20, GRID_TOP_BUFFER - (cube_size + 5), cube_size, cube_size))
     text_visited_surf = legend_font.render("Start Cell", True, DARK_SLATE_GRAY)
-    win.blit(text_visited_surf, (GRID_LEFT_BUFFER + cube_size + spacing + 20, GRID_TOP_BUFFER - (cube_size + 5)))
+    header.blit(text_visited_surf, (GRID_LEFT_BUFFER + cube_size + spacing + 20, GRID_TOP_BUFFER - (cube_size + 5)))
     
     # Legend - End
-    pygame.draw.rect(win, RED, (GRID_LEFT_BUFFER + 216, GRID_TOP_BUFFER - (cube_size + 5), cube_size, cube_size))
+    pygame.draw.rect(header, RED, (GRID_LEFT_BUFFER + 216, GRID_TOP_BUFFER - (cube_size + 5), cube_size, cube_size))
     text_visited_surf = legend_font.render("End Cell", True, DARK_SLATE_GRAY)
-    win.blit(text_visited_surf, (GRID_LEFT_BUFFER + cube_size + spacing + 216, GRID_TOP_BUFFER - (cube_size + 5)))
+    header.blit(text_visited_surf, (GRID_LEFT_BUFFER + cube_size + spacing + 216, GRID_TOP_BUFFER - (cube_size + 5)))
     
     # Legend - Wall
-    pygame.draw.rect(win, DARK_SLATE_GRAY, (GRID_LEFT_BUFFER + 416, GRID_TOP_BUFFER - (cube_size + 5), cube_size, cube_size))
+    pygame.draw.rect(header, DARK_SLATE_GRAY, (GRID_LEFT_BUFFER + 416, GRID_TOP_BUFFER - (cube_size + 5), cube_size, cube_size))
     text_visited_surf = legend_font.render("Wall/Obstacle Cell", True, DARK_SLATE_GRAY)
-    win.blit(text_visited_surf, (GRID_LEFT_BUFFER + cube_size + spacing + 416, GRID_TOP_BUFFER - (cube_size + 5)))
+    header.blit(text_visited_surf, (GRID_LEFT_BUFFER + cube_size + spacing + 416, GRID_TOP_BUFFER - (cube_size + 5)))
     
     # Legend - Unvisited
-    pygame.draw.rect(win, DARK_SLATE_GRAY, (GRID_LEFT_BUFFER + 696, GRID_TOP_BUFFER - (cube_size + 5), cube_size, cube_size), width=1)
+    pygame.draw.rect(header, DARK_SLATE_GRAY, (GRID_LEFT_BUFFER + 696, GRID_TOP_BUFFER - (cube_size + 5), cube_size, cube_size), width=1)
     text_visited_surf = legend_font.render("Unvisited Cells", True, DARK_SLATE_GRAY)
-    win.blit(text_visited_surf, (GRID_LEFT_BUFFER + cube_size + spacing + 696, GRID_TOP_BUFFER - (cube_size + 5)))
+    header.blit(text_visited_surf, (GRID_LEFT_BUFFER + cube_size + spacing + 696, GRID_TOP_BUFFER - (cube_size + 5)))
     
     # Legend - Visited Cells
-    pygame.draw.rect(win, DODGER_BLUE, (GRID_LEFT_BUFFER + 956, GRID_TOP_BUFFER - (cube_size + 5), cube_size, cube_size))
-    pygame.draw.rect(win, LIGHT_GRAY, (GRID_LEFT_BUFFER + 986, GRID_TOP_BUFFER - (cube_size + 5), cube_size, cube_size))
+    pygame.draw.rect(header, DODGER_BLUE, (GRID_LEFT_BUFFER + 956, GRID_TOP_BUFFER - (cube_size + 5), cube_size, cube_size))
+    pygame.draw.rect(header, LIGHT_GRAY, (GRID_LEFT_BUFFER + 986, GRID_TOP_BUFFER - (cube_size + 5), cube_size, cube_size))
     text_visited_surf = legend_font.render("Visited Cells", True, DARK_SLATE_GRAY)
-    win.blit(text_visited_surf, (GRID_LEFT_BUFFER + cube_size + spacing + 986, GRID_TOP_BUFFER - (cube_size + 5)))
+    header.blit(text_visited_surf, (GRID_LEFT_BUFFER + cube_size + spacing + 986, GRID_TOP_BUFFER - (cube_size + 5)))
     
     # Legend - Path
-    pygame.draw.rect(win, GOLD, (GRID_LEFT_BUFFER + 1190, GRID_TOP_BUFFER - (cube_size + 5), cube_size, cube_size))
+    pygame.draw.rect(header, GOLD, (GRID_LEFT_BUFFER + 1190, GRID_TOP_BUFFER - (cube_size + 5), cube_size, cube_size))
     text_visited_surf = legend_font.render("Path", True, DARK_SLATE_GRAY)
-    win.blit(text_visited_surf, (GRID_LEFT_BUFFER + cube_size + spacing + 1190, GRID_TOP_BUFFER - (cube_size + 5)))
-    return
+    header.blit(text_visited_surf, (GRID_LEFT_BUFFER + cube_size + spacing + 1190, GRID_TOP_BUFFER - (cube_size + 5)))
+    return header
+
+def get_header_surface():
+    global header_surface
+    if header_surface is None:
+        header_surface = render_header()
+    return header_surface
+
+def draw_stationary_objects(win, full=False):
+    # With full=True the whole header is drawn, otherwise only the buttons
+    # whose hover state changed. Returns the rects to update on the screen.
+    if full:
+        win.blit(get_header_surface(), HEADER_RECT)
+        for button in buttons:
+            button.hovered = None
+    
+    rects = []
+    for button in buttons:
+        button.draw(win)
+        if button.redrawn:
+            button.redrawn = False
+            rects.append(button.button_rect)
+    if full:
+        return [HEADER_RECT]
+    return rects
 
 # Main Function ###############################################################
 def main(win, rows, grid_width, grid_height):
@@ -805,11 +666,30 @@ def main(win, rows, grid_width, grid_height):
     algorithm_started = False
     algorithm_completed = False
     path_found = False
+    # Generator of the running search and whether it runs in turbo mode
+    search = None
+    turbo = TURBO_MODE
+    
+    # The whole window is drawn once, after that every frame only redraws the
+    # buttons and the cells which changed
+    win.fill(WHITE)
+    draw_stationary_objects(win, full=True)
+    draw_grid(win, grid, rows, grid_width, grid_height, full=True)
+    pygame.display.update()
     
     while running:
-        WIN.fill(WHITE) # Refresh the screen to clear the previous content
+        # Run the search for one frame
+        if search is not None:
+            path_found = run_search_frame(search, grid, START, END, turbo)
+            if path_found is not None:
+                search = None
+                if not path_found:
+                    draw_grid(win, grid, rows, grid_width, grid_height)
+                    draw_path_not_found(win, lambda: draw_grid(win, grid, rows, grid_width, grid_height), grid, rows, grid_width, grid_height)
+                algorithm_started = False
+                algorithm_completed = True
         
-        draw_stationary_objects(win)
+        header_rects = draw_stationary_objects(win)
         draw_grid(win, grid, rows, grid_width, grid_height)
         
         for event in pygame.event.get():
@@ -818,6 +698,10 @@ def main(win, rows, grid_width, grid_height):
                running = False
                break
             
+            # User can press T to turn turbo mode on or off, also while an algorithm is running
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_t:
+                turbo = not turbo
+            
             # User should not be able to change anything while an algorithm is running
             # User can still quit anytime
             if algorithm_started:
@@ -867,67 +751,45 @@ def main(win, rows, grid_width, grid_height):
             
             # Generate Random Maze
             if maze_button.draw(win) and not algorithm_started:
-                algorithm_started = True
                 reset_grid(grid)
+                generate_random_maze(grid, START, END)
                 if START:
                     START.set_start()
                 if END:
                     END.set_end()
-                generate_random_maze(0, 0, cols, rows, grid, lambda: draw_grid(win, grid, rows, grid_width, grid_height))
-                algorithm_started = False
             
             if not algorithm_started and START and END:
                 # Start Dijkstra's algorithm
                 if dijkstra_button.draw(win):
-                    algorithm_started = True
-                    update_cell_neighbors(grid)
-                    path_found = dijkstra_algorithm(lambda: draw_grid(win, grid, rows, grid_width, grid_height), grid, START, END)
-                    if not path_found:
-                        draw_path_not_found(win, lambda: draw_grid(win, grid, rows, grid_width, grid_height), grid, rows, grid_width, grid_height)
-                    algorithm_started = False
-                    algorithm_completed = True
+                    search = dijkstra_algorithm(grid, START, END)
                 # Start A* Search algorithm
                 elif a_star_button.draw(win):
-                    algorithm_started = True
-                    update_cell_neighbors(grid)
-                    path_found = a_star_search_algorithm(lambda: draw_grid(win, grid, rows, grid_width, grid_height), grid, START, END)
-                    if not path_found:
-                        draw_path_not_found(win, lambda: draw_grid(win, grid, rows, grid_width, grid_height), grid, rows, grid_width, grid_height)
-                    algorithm_started = False
-                    algorithm_completed = True
+                    search = a_star_search_algorithm(grid, START, END)
                 # Start Bidirectional Search algorithm
                 elif bidirectional_button.draw(win):
-                    algorithm_started = True
-                    update_cell_neighbors(grid)
-                    path_found = bidirectional_search_algorithm(lambda: draw_grid(win, grid, rows, grid_width, grid_height), grid, START, END)
-                    if not path_found:
-                        draw_path_not_found(win, lambda: draw_grid(win, grid, rows, grid_width, grid_height), grid, rows, grid_width, grid_height)
-                    algorithm_started = False
-                    algorithm_completed = True
+                    search = bidirectional_search_algorithm(grid, START, END)
                 # Start BFS algorithm
                 elif bfs_button.draw(win):
-                    algorithm_started = True
-                    update_cell_neighbors(grid)
-                    path_found = BFS_algorithm(lambda: draw_grid(win, grid, rows, grid_width, grid_height), grid, START, END)
-                    if not path_found:
-                        draw_path_not_found(win, lambda: draw_grid(win, grid, rows, grid_width, grid_height), grid, rows, grid_width, grid_height)
-                    algorithm_started = False
-                    algorithm_completed = True
+                    search = BFS_algorithm(grid, START, END)
                 # Start DFS algorithm
                 elif dfs_button.draw(win):
+                    search = DFS_algorithm(grid, START, END)
+                # Start Jump Point Search algorithm
+                elif jps_button.draw(win):
+                    search = jump_point_search_algorithm(grid, START, END)
+                
+                # The search runs from the next frame on
+                if search is not None:
                     algorithm_started = True
-                    update_cell_neighbors(grid)
-                    path_found = DFS_algorithm(lambda: draw_grid(win, grid, rows, grid_width, grid_height), grid, START, END)
-                    if not path_found:
-                        draw_path_not_found(win, lambda: draw_grid(win, grid, rows, grid_width, grid_height), grid, rows, grid_width, grid_height)
-                    algorithm_started = False
-                    algorithm_completed = True
         
-        # Update the screen to show the content
-        pygame.display.update()
+        # Update the buttons which changed on the screen, draw_grid updates the cells
+        pygame.display.update(header_rects)
         # Limit FPS to 60
-        CLOCK.tick(60)
-        
+        CLOCK.tick(FPS)
+    
     pygame.quit()
     return
-main(WIN, GRID_ROWS, GRID_WIDTH, GRID_HEIGHT)
+
+if __name__ == "__main__":
+    WIN = pygame.display.set_mode((WIN_WIDTH, WIN_HEIGHT))
+    main(WIN, GRID_ROWS, GRID_WIDTH, GRID_HEIGHT)
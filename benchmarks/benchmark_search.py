@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+"""
+Search benchmark
+
+Description:
+    Times every algorithm of the headless engine on a serpentine maze with the
+    dimensions of the visualizer at GRID_ROWS = 290 (290 x 640 cells). The
+    maze is one long corridor, which is the worst case for searches which
+    keep a copy of the path in every node.
+
+Usage:
+    python benchmarks/benchmark_search.py [rows] [cols]
+"""
+# Libraries ###################################################################
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import pathfinding
+
+# Maze ########################################################################
+def serpentine_maze(rows, cols):
+    # Every odd row is a wall with a single gap alternating between both ends
+    grid = pathfinding.Grid(rows, cols)
+    for row in range(1, rows, 2):
+        gap = cols - 1 if row % 4 == 1 else 0
+        for col in range(cols):
+            if col != gap:
+                grid.set_wall((row, col))
+    return grid
+
+# Main Function ###############################################################
+def main(rows=290, cols=640):
+    grid = serpentine_maze(rows, cols)
+    start = (0, 0)
+    end = (rows - 1, 0) if (rows - 1) % 4 == 0 else (rows - 1, cols - 1)
+    
+    print("Serpentine maze %dx%d" % (rows, cols))
+    for name, search in pathfinding.ALGORITHMS.items():
+        result = search(grid, start, end)
+        print("%-14s path %7d  expanded %7d  %8.3fs" % (name, len(result.path), result.stats["expanded"], result.stats["elapsed"]))
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:3]])
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""
+Headless path finding engine used by the pygame visualizer (astartpath2.py).
+
+Usage:
+    from pathfinding import Grid, find_path
+    walls = [[0, 0, 0],
+             [1, 1, 0],
+             [0, 0, 0]]
+    result = find_path(walls, (0, 0), (2, 0), algorithm="a_star")
+    result.found, result.path, result.stats
+
+    Searches accept a plain list of rows like the one above or a compact Grid,
+    which keeps one state byte per cell and is reused between queries:
+    grid = Grid.from_rows(walls)
+    result = find_path(grid, (0, 0), (2, 0))
+"""
+from .grid import Grid, as_grid, WALL, VISITED, IN_QUEUE, PATH, DIAGONAL_COST
+from .search import (
+    SearchResult,
+    ALGORITHMS,
+    find_path,
+    search_steps,
+    dijkstra,
+    a_star,
+    bidirectional,
+    bfs,
+    dfs,
+    iddfs,
+    jump_point_search,
+)
+from .heuristics import (
+    HEURISTICS,
+    manhattan,
+    octile,
+    chebyshev,
+    euclidean,
+)
+from .hpa import HierarchicalPathfinder
+from .dstar import DStarLite
+from .batch import Workspace, find_paths
+from .cache import PathCache
+from .flowfield import FlowField
+from .components import ComponentIndex
+from .landmarks import Landmarks
+from .mazes import (
+    GENERATORS,
+    generate_maze,
+    recursive_division,
+    prim_maze,
+    kruskal_maze,
+    cellular_caves,
+    noise_terrain,
+)
+from .mapfile import save_map, load_map, load_movingai, save_movingai
+
+def __getattr__(name):
+    # The process pool is imported on first use, multiprocessing and
+    # concurrent.futures take longer to import than the whole package
+    if name in ("ParallelPathfinder", "find_paths_parallel"):
+        from . import parallel
+        return getattr(parallel, name)
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+"""
+Batch queries
+
+Description:
+    Games path many units per tick against the same map. Running a_star once
+    per unit clears the flags of the whole grid and allocates g score and
+    predecessor buffers of the grid size for every query, which costs more
+    than the search itself when the paths are short.
+
+    A Workspace keeps those buffers between queries. Instead of refilling
+    them, every query gets a new generation number: a g score only counts
+    when the stamp of its cell equals the current generation and a cell is
+    closed when its closed stamp does, so a query only touches the cells it
+    expands. The neighbor masks, the cheapest cost and the heuristic are
+    prepared once per batch.
+
+    Batch searches run A*, Dijkstra's algorithm (A* without a heuristic) or
+    BFS and return the same kind of paths and stats as the single searches,
+    but do not set the visited, in queue and path flags of the grid.
+
+Usage:
+    workspace = Workspace(grid)
+    results = workspace.find_paths([((0, 0), (5, 7)), ((3, 1), (9, 9))])
+    results = workspace.find_paths(pairs, algorithm="bfs")
+    results = find_paths(grid, pairs)   # one-off, with its own workspace
+"""
+# Libraries ###################################################################
+from array import array
+from collections import deque
+from heapq import heappush, heappop
+import time
+
+from .grid import DIAGONAL_COST, as_grid
+from .heuristics import get_heuristic
+from .search import SearchResult, _check_positions, construct_path
+
+# Variables ###################################################################
+# Largest generation the stamp arrays can hold before they are cleared
+MAX_GENERATION = 2 ** 32 - 1
+
+BATCH_ALGORITHMS = ("a_star", "dijkstra", "bfs")
+
+def _no_heuristic(p1, p2, min_cost=1):
+    return 0
+
+# Workspace Class #############################################################
+class Workspace:
+    def __init__(self, grid):
+        self.grid = as_grid(grid)
+        size = self.grid.size
+        self.generation = 0
+        # Generation in which the g score of a cell was set / it was closed
+        self.stamp = array("I", [0]) * size
+        self.closed = array("I", [0]) * size
+        self.g_score = array("d", [0]) * size
+        self.previous = array("i", [0]) * size
+    
+    def _next_generation(self):
+        self.generation += 1
+        if self.generation > MAX_GENERATION:
+            size = self.grid.size
+            self.stamp = array("I", [0]) * size
+            self.closed = array("I", [0]) * size
+            self.generation = 1
+        return self.generation
+    
+    def find_paths(self, pairs, algorithm="a_star", heuristic=None, components=None):
+        # With a ComponentIndex as components, pairs in different components
+        # are answered without searching
+        grid = self.grid
+        pairs = list(pairs)
+        for start, end in pairs:
+            _check_positions(grid, start, end)
+        grid.update_masks()
+        if components is None:
+            return self._run(pairs, algorithm, heuristic, grid.min_cost)
+        
+        connected = [components.connected(start, end) for start, end in pairs]
+        results = iter(self._run([pair for pair, linked in zip(pairs, connected) if linked],
+                                 algorithm, heuristic, grid.min_cost))
+        return [next(results) if linked else self._result([], 0, time.perf_counter(), unreachable=True)
+                for linked in connected]
+    
+    def _run(self, pairs, algorithm, heuristic, min_cost):
+        # Expects the neighbor masks of the grid to be up to date
+        grid = self.grid
+        index = grid.index
+        if algorithm == "bfs":
+            return [self._bfs(index(start), index(end)) for start, end in pairs]
+        if algorithm == "dijkstra":
+            heuristic_function = _no_heuristic
+        elif algorithm == "a_star":
+            heuristic_function = get_heuristic(heuristic, grid.diagonal)
+        else:
+            raise ValueError("Unknown batch algorithm: %s" % algorithm)
+        return [self._a_star(index(start), index(end), heuristic_function, min_cost)
+                for start, end in pairs]
+    
+    def _a_star(self, start, end, heuristic_function, min_cost):
+        started = time.perf_counter()
+        grid = self.grid
+        masks = grid.masks
+        steps = grid.steps
+        costs = grid.costs
+        position = grid.position
+        stamp = self.stamp
+        closed = self.closed
+        g_score = self.g_score
+        previous = self.previous
+        generation = self._next_generation()
+        expanded = pushes = pops = stale = 0
+        
+        end_position = position(end)
+        stamp[start] = generation
+        g_score[start] = 0
+        previous[start] = start
+        h_score = heuristic_function(position(start), end_position, min_cost)
+        queue = [(h_score, h_score, start)]
+        pushes += 1
+        
+        while queue:
+            current = heappop(queue)[2]
+            pops += 1
+            
+            if closed[current] == generation:
+                stale += 1
+                continue
+            closed[current] = generation
+            expanded += 1
+            
+            if current == end:
+                path = construct_path(previous, current, start)
+                return self._result(path, expanded, started, cost=g_score[current], pushes=pushes, pops=pops, stale=stale)
+            
+            current_g_score = g_score[current]
+            orthogonal, diagonal = steps[masks[current]]
+            for offsets, factor in ((orthogonal, 1), (diagonal, DIAGONAL_COST)):
+                for offset in offsets:
+                    neighbor = current + offset
+                    if closed[neighbor] == generation:
+                        continue
+                    
+                    temp_g_score = current_g_score + costs[neighbor] * factor
+                    if stamp[neighbor] != generation or temp_g_score < g_score[neighbor]:
+                        stamp[neighbor] = generation
+                        g_score[neighbor] = temp_g_score
+                        previous[neighbor] = current
+                        h_score = heuristic_function(position(neighbor), end_position, min_cost)
+                        heappush(queue, (round(temp_g_score + h_score, 9), h_score, neighbor))
+                        pushes += 1
+        return self._result([], expanded, started, pushes=pushes, pops=pops, stale=stale)
+    
+    def _bfs(self, start, end):
+        # Cells are stamped when they are added to the queue
+        started = time.perf_counter()
+        grid = self.grid
+        masks = grid.masks
+        steps = grid.steps
+        stamp = self.stamp
+        previous = self.previous
+        generation = self._next_generation()
+        expanded = 0
+        
+        stamp[start] = generation
+        previous[start] = start
+        queue = deque([start])
+        
+        while queue:
+            current = queue.popleft()
+            expanded += 1
+            if current == end:
+                return self._result(construct_path(previous, end, start), expanded, started)
+            
+            orthogonal, diagonal = steps[masks[current]]
+            for offsets in (orthogonal, diagonal):
+                for offset in offsets:
+                    neighbor = current + offset
+                    if stamp[neighbor] != generation:
+                        stamp[neighbor] = generation
+                        previous[neighbor] = current
+                        queue.append(neighbor)
+        return self._result([], expanded, started)
+    
+    def _result(self, path, expanded, started, **counters):
+        stats = {"expanded": expanded, "elapsed": time.perf_counter() - started}
+        stats.update(counters)
+        return SearchResult(bool(path), [self.grid.position(index) for index in path], stats)
+
+def find_paths(grid, pairs, algorithm="a_star", heuristic=None, components=None):
+    return Workspace(grid).find_paths(pairs, algorithm, heuristic, components)
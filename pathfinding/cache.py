@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+"""
+Path cache
+
+Description:
+    Agents often ask for the same path tick after tick. PathCache sits in
+    front of find_path and remembers results keyed by start, end, algorithm
+    and the search options (e.g. the heuristic), evicting the least recently
+    used ones once the cached paths hold more than max_cells cells in total.
+
+    The cache listens to changes of the grid. A wall or cost change on a cell
+    of a cached path drops that path, found through an index from cell to the
+    entries whose path crosses it. On 8-connected grids a diagonal step may
+    not cut the corner of a wall, so the two cells beside every diagonal step
+    are indexed as well and a wall added on one of them drops the path too.
+    Any change drops the cached "not found" results, since a path may exist
+    now. Paths which do not cross a changed cell stay cached: they are still
+    valid, but a wall opening elsewhere may have made a shorter one possible.
+
+Usage:
+    cache = PathCache(grid, max_cells=100000)
+    result = cache.find_path((0, 0), (9, 9), algorithm="a_star")
+    cache.hits, cache.misses, cache.evictions, cache.invalidations
+    cache.close()   # stops listening to the grid
+"""
+# Libraries ###################################################################
+from collections import OrderedDict
+
+from .grid import WALL, as_grid
+from .search import find_path
+
+# Path Cache Class ############################################################
+class PathCache:
+    def __init__(self, grid, max_cells=1000000):
+        if max_cells < 1:
+            raise ValueError("Cache size must be at least 1 cell, got %r" % max_cells)
+        self.grid = as_grid(grid)
+        self.max_cells = max_cells
+        # key -> (SearchResult, path as cell indices), least recently used first
+        self.entries = OrderedDict()
+        # cell index -> keys of the entries whose path crosses it, and of the
+        # entries with a diagonal step past its corner
+        self.cells = {}
+        self.corners = {}
+        self.not_found = set()
+        self.size = 0
+        
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.grid.add_listener(self._cell_changed)
+    
+    def close(self):
+        self.grid.remove_listener(self._cell_changed)
+    
+    def __len__(self):
+        return len(self.entries)
+    
+    @property
+    def counters(self):
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                "invalidations": self.invalidations, "entries": len(self.entries), "cells": self.size}
+    
+    def find_path(self, start, end, algorithm="a_star", **options):
+        key = (tuple(start), tuple(end), algorithm, tuple(sorted(options.items())))
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+        
+        self.misses += 1
+        result = find_path(self.grid, start, end, algorithm, **options)
+        self._add(key, result)
+        return result
+    
+    def clear(self):
+        self.entries.clear()
+        self.cells.clear()
+        self.corners.clear()
+        self.not_found.clear()
+        self.size = 0
+    
+    def _add(self, key, result):
+        index = self.grid.index
+        path = [index(position) for position in result.path]
+        self.entries[key] = (result, path)
+        self.size += len(path) + 1
+        if result.found:
+            for cell in path:
+                self.cells.setdefault(cell, set()).add(key)
+            for corner in self._corners(path):
+                self.corners.setdefault(corner, set()).add(key)
+        else:
+            self.not_found.add(key)
+        
+        # Evict the least recently used entries, but never the new one
+        while self.size > self.max_cells and len(self.entries) > 1:
+            self._remove(next(iter(self.entries)))
+            self.evictions += 1
+    
+    def _corners(self, path):
+        # The two cells beside every diagonal step of a path
+        cols = self.grid.cols
+        for current, following in zip(path, path[1:]):
+            row, col = divmod(current, cols)
+            following_row, following_col = divmod(following, cols)
+            if row != following_row and col != following_col:
+                yield row * cols + following_col
+                yield following_row * cols + col
+    
+    def _remove(self, key):
+        result, path = self.entries.pop(key)
+        self.size -= len(path) + 1
+        self.not_found.discard(key)
+        for index, cells in ((self.cells, path), (self.corners, self._corners(path))):
+            for cell in cells:
+                keys = index.get(cell)
+                if keys is not None:
+                    keys.discard(key)
+                    if not keys:
+                        del index[cell]
+    
+    def _cell_changed(self, index):
+        if index is None:
+            self.invalidations += len(self.entries)
+            self.clear()
+            return
+        
+        stale = set(self.not_found)
+        stale.update(self.cells.get(index, ()))
+        if self.grid.cells[index] & WALL:
+            stale.update(self.corners.get(index, ()))
+        for key in stale:
+            self._remove(key)
+        self.invalidations += len(stale)
@@ -0,0 +1,230 @@
+# -*- coding: utf-8 -*-
+"""
+Connected component index
+
+Description:
+    A search for an unreachable cell only fails after it expanded every cell
+    it can reach, which makes failed queries the most expensive ones. The
+    ComponentIndex labels every free cell with the connected component it
+    belongs to, so whether two cells are connected is answered by comparing
+    two labels before any search starts.
+
+    Labels are kept in a flat array and merged with union-find. The index
+    listens to wall changes and applies each one as it happens, while the
+    grid around it is in the state that change left it in:
+        - a wall removed joins the components around the cell with a union
+        - a wall added can only split its component if the free cells
+          around it are no longer connected to each other without it. Only
+          then a BFS is started from each separated side, all of them taking
+          turns one cell at a time, and every side which runs out of cells
+          before the others gets a new label, so the work is bounded by the
+          smaller sides instead of the whole component.
+    When more than 1/64 of the cells change between two queries, e.g. for a
+    new maze, the index stops following them and rebuilds on the next query.
+
+Usage:
+    components = ComponentIndex(grid)
+    components.connected((0, 0), (99, 99))
+    result = find_path(grid, (0, 0), (99, 99), components=components)
+    components.close()   # stops listening to the grid
+"""
+# Libraries ###################################################################
+from array import array
+from collections import deque
+
+from .grid import WALL, as_grid
+from .search import _check_positions
+
+# Component Index Class #######################################################
+class ComponentIndex:
+    def __init__(self, grid):
+        self.grid = as_grid(grid)
+        self.changes = 0
+        self.rebuild = False
+        self.grid.add_listener(self._cell_changed)
+        self.build()
+    
+    def close(self):
+        self.grid.remove_listener(self._cell_changed)
+    
+    def _cell_changed(self, index):
+        if self.rebuild:
+            return
+        self.changes += 1
+        if index is None or self.changes > self.grid.size // 64:
+            self.rebuild = True
+            return
+        
+        # Cost changes don't matter, only walls which came or went
+        is_wall = self.grid.cells[index] & WALL
+        if is_wall and self.labels[index] >= 0:
+            self._wall_added(index)
+        elif not is_wall and self.labels[index] < 0:
+            self._wall_removed(index)
+    
+    # Building ################################################################
+    def build(self):
+        grid = self.grid
+        grid.update_masks()
+        cells = grid.cells
+        masks = grid.masks
+        steps = grid.steps
+        # Component label of every cell, -1 for walls
+        self.labels = labels = array("i", [-1]) * grid.size
+        # Union-find parent of every label
+        self.parent = parent = []
+        
+        for index in range(grid.size):
+            if labels[index] >= 0 or cells[index] & WALL:
+                continue
+            label = len(parent)
+            parent.append(label)
+            labels[index] = label
+            queue = deque([index])
+            while queue:
+                current = queue.popleft()
+                orthogonal, diagonal = steps[masks[current]]
+                for offsets in (orthogonal, diagonal):
+                    for offset in offsets:
+                        neighbor = current + offset
+                        if labels[neighbor] < 0:
+                            labels[neighbor] = label
+                            queue.append(neighbor)
+        
+        self.rebuild = False
+    
+    def update(self):
+        # Called by every query, rebuilds after too many changes
+        if self.rebuild:
+            self.build()
+        self.changes = 0
+    
+    def find(self, label):
+        parent = self.parent
+        while parent[label] != label:
+            parent[label] = parent[parent[label]]
+            label = parent[label]
+        return label
+    
+    def _new_label(self):
+        label = len(self.parent)
+        self.parent.append(label)
+        return label
+    
+    def _wall_removed(self, index):
+        labels = self.labels
+        roots = {self.find(labels[neighbor]) for neighbor in self.grid.neighbors(index) if labels[neighbor] >= 0}
+        if not roots:
+            labels[index] = self._new_label()
+            return
+        
+        root = roots.pop()
+        for other in roots:
+            self.parent[other] = root
+        labels[index] = root
+    
+    def _wall_added(self, index):
+        grid = self.grid
+        labels = self.labels
+        root = self.find(labels[index])
+        labels[index] = -1
+        
+        # Free cells around the new wall, grouped by how they connect without it
+        row, col = divmod(index, grid.cols)
+        ring = set()
+        for near_row in range(max(row - 1, 0), min(row + 2, grid.rows)):
+            for near_col in range(max(col - 1, 0), min(col + 2, grid.cols)):
+                near = near_row * grid.cols + near_col
+                if near != index and not grid.cells[near] & WALL:
+                    ring.add(near)
+        
+        seeds = []
+        seen = set()
+        for near in ring:
+            if near in seen:
+                continue
+            group = [near]
+            seen.add(near)
+            for current in group:
+                for neighbor in grid.neighbors(current):
+                    if neighbor in ring and neighbor not in seen:
+                        seen.add(neighbor)
+                        group.append(neighbor)
+            for cell in group:
+                if labels[cell] >= 0 and self.find(labels[cell]) == root:
+                    seeds.append(cell)
+                    break
+        if len(seeds) > 1:
+            self._split(seeds, root)
+    
+    def _split(self, seeds, root):
+        # One BFS per seed, taking turns one cell at a time. BFSs which meet
+        # are on the same side and merge. Once at most one side is still
+        # growing, every finished side is a component of its own.
+        grid = self.grid
+        labels = self.labels
+        sides = list(range(len(seeds)))
+        
+        def side_of(flood):
+            while sides[flood] != flood:
+                flood = sides[flood]
+            return flood
+        
+        owner = {seed: flood for flood, seed in enumerate(seeds)}
+        queues = [deque([seed]) for seed in seeds]
+        while True:
+            growing = {side_of(flood) for flood, queue in enumerate(queues) if queue}
+            if len(growing) <= 1:
+                break
+            for flood, queue in enumerate(queues):
+                if not queue:
+                    continue
+                current = queue.popleft()
+                for neighbor in grid.neighbors(current):
+                    other = owner.get(neighbor)
+                    if other is None:
+                        owner[neighbor] = flood
+                        queue.append(neighbor)
+                    elif side_of(other) != side_of(flood):
+                        sides[side_of(other)] = side_of(flood)
+        
+        cells = {}
+        for cell, flood in owner.items():
+            cells.setdefault(side_of(flood), []).append(cell)
+        # The side still growing, or else the largest one, keeps the label
+        if growing:
+            keep = growing.pop()
+        else:
+            keep = max(cells, key=lambda side: len(cells[side]))
+        for side, side_cells in cells.items():
+            if side != keep:
+                label = self._new_label()
+                for cell in side_cells:
+                    labels[cell] = label
+    
+    # Queries #################################################################
+    def component(self, position):
+        # Component of a cell, -1 for walls
+        _check_positions(self.grid, position)
+        self.update()
+        label = self.labels[self.grid.index(position)]
+        return self.find(label) if label >= 0 else -1
+    
+    def connected(self, start, end):
+        # Like the searches, a wall at the start still steps to its neighbors
+        grid = self.grid
+        _check_positions(grid, start, end)
+        self.update()
+        labels = self.labels
+        start = grid.index(start)
+        end = grid.index(end)
+        if start == end:
+            return True
+        if labels[end] < 0:
+            return False
+        
+        end_root = self.find(labels[end])
+        if labels[start] >= 0:
+            return self.find(labels[start]) == end_root
+        return any(labels[neighbor] >= 0 and self.find(labels[neighbor]) == end_root
+                   for neighbor in grid.neighbors(start))
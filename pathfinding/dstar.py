@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+"""
+Incremental replanning (D* Lite)
+
+Description:
+    A* starts from scratch on every query, even if only one door opened since
+    the last one. D* Lite searches backwards from the end and keeps its search
+    state between queries: g is the cost to the end each cell had when it was
+    last expanded and rhs the one its neighbors currently give it. Cells where
+    the two differ are queued. When walls or costs change only the changed
+    cells and their neighbors are updated, and the next query repairs the
+    part of the search they affect instead of running it again. With a start
+    which never moves this is the same as LPA*.
+
+    The planner listens to changes of the grid and applies them on the next
+    query. The agent may move between queries, passing its new position as
+    start keeps the queue valid through the key modifier km.
+
+Usage:
+    planner = DStarLite(grid, (0, 0), (99, 99))
+    result = planner.find_path()
+    grid.set_wall((50, 50))           # a door closes
+    result = planner.find_path((3, 4)) # the agent moved to (3, 4) meanwhile
+    planner.close()                   # stops listening to the grid
+"""
+# Libraries ###################################################################
+from array import array
+from heapq import heappush, heappop
+import time
+
+from .grid import WALL, as_grid
+from .heuristics import get_heuristic
+from .search import SearchResult, _check_positions
+
+# D* Lite Class ###############################################################
+class DStarLite:
+    def __init__(self, grid, start, end, heuristic=None):
+        self.grid = as_grid(grid)
+        self.heuristic = get_heuristic(heuristic, self.grid.diagonal)
+        _check_positions(self.grid, start, end)
+        self.start = self.grid.index(start)
+        self.end = self.grid.index(end)
+        self.changed = set()
+        self.grid.add_listener(self._cell_changed)
+        self.initialize()
+    
+    def close(self):
+        self.grid.remove_listener(self._cell_changed)
+    
+    def initialize(self):
+        # Throws away the search state, the next query runs a full search
+        grid = self.grid
+        self.g = array("d", [float("inf")]) * grid.size
+        self.rhs = array("d", [float("inf")]) * grid.size
+        self.queue = []
+        self.km = 0
+        self.last_start = self.start
+        self.min_cost = grid.min_cost
+        self.changed.clear()
+        self.reinitialize = False
+        if not grid.cells[self.end] & WALL:
+            self.rhs[self.end] = 0
+            heappush(self.queue, self._key(self.end) + (self.end,))
+    
+    def _cell_changed(self, index):
+        if index is None or self.grid.costs[index] < self.min_cost:
+            # A cheaper cell would make the heuristic overestimate
+            self.reinitialize = True
+        else:
+            self.changed.add(index)
+    
+    def _heuristic(self, index):
+        return self.heuristic(self.grid.position(self.start), self.grid.position(index), self.min_cost)
+    
+    def _key(self, index):
+        best = min(self.g[index], self.rhs[index])
+        return (round(best + self._heuristic(index) + self.km, 9), best)
+    
+    def _update_vertex(self, index):
+        grid = self.grid
+        g = self.g
+        rhs = self.rhs
+        best = float("inf")
+        if not grid.cells[index] & WALL:
+            if index == self.end:
+                best = 0
+            else:
+                for neighbor, step_cost in grid.neighbor_costs(index):
+                    cost = step_cost + g[neighbor]
+                    if cost < best:
+                        best = cost
+        rhs[index] = best
+        # Entries of consistent cells are skipped when popped
+        if g[index] != rhs[index]:
+            heappush(self.queue, self._key(index) + (index,))
+            return 1
+        return 0
+    
+    def _apply_changes(self):
+        # A changed cell changes the steps into and out of it and, through
+        # the corner rule, the diagonal steps between the cells around it
+        grid = self.grid
+        cols = grid.cols
+        pushes = 0
+        touched = set()
+        for index in self.changed:
+            row, col = divmod(index, cols)
+            for near_row in range(max(row - 1, 0), min(row + 2, grid.rows)):
+                for near_col in range(max(col - 1, 0), min(col + 2, cols)):
+                    touched.add(near_row * cols + near_col)
+        for index in touched:
+            pushes += self._update_vertex(index)
+        changed = len(self.changed)
+        self.changed.clear()
+        return changed, pushes
+    
+    def _compute_shortest_path(self):
+        grid = self.grid
+        g = self.g
+        rhs = self.rhs
+        queue = self.queue
+        start = self.start
+        expanded = pushes = stale = 0
+        
+        while queue:
+            start_key = self._key(start)
+            if queue[0][:2] >= start_key and rhs[start] == g[start]:
+                break
+            
+            entry = heappop(queue)
+            current = entry[2]
+            if g[current] == rhs[current]:
+                stale += 1
+                continue
+            
+            key = self._key(current)
+            if entry[:2] < key:
+                heappush(queue, key + (current,))
+                pushes += 1
+                continue
+            
+            expanded += 1
+            if g[current] > rhs[current]:
+                g[current] = rhs[current]
+            else:
+                g[current] = float("inf")
+                pushes += self._update_vertex(current)
+            # The neighbors of a cell are also the cells stepping into it
+            for neighbor in grid.neighbors(current):
+                pushes += self._update_vertex(neighbor)
+        return expanded, pushes, stale
+    
+    def find_path(self, start=None):
+        started = time.perf_counter()
+        grid = self.grid
+        if start is not None:
+            _check_positions(grid, start)
+            self.start = grid.index(start)
+        
+        if self.reinitialize:
+            self.initialize()
+        # Keys already queued were computed from the old start, km makes up
+        # for how much closer the heuristic got since then
+        if self.start != self.last_start:
+            self.km += self.heuristic(grid.position(self.last_start), grid.position(self.start), self.min_cost)
+            self.last_start = self.start
+        changed, pushes = self._apply_changes()
+        expanded, more_pushes, stale = self._compute_shortest_path()
+        stats = {"expanded": expanded, "changed": changed, "pushes": pushes + more_pushes, "stale": stale}
+        
+        path = self._extract_path()
+        if path:
+            stats["cost"] = self.g[self.start]
+        stats["elapsed"] = time.perf_counter() - started
+        return SearchResult(bool(path), [grid.position(index) for index in path], stats)
+    
+    def _extract_path(self):
+        # Walks downhill on g from the start to the end
+        grid = self.grid
+        g = self.g
+        current = self.start
+        if g[current] == float("inf") or grid.cells[current] & WALL:
+            return []
+        
+        path = [current]
+        while current != self.end:
+            best = float("inf")
+            following = -1
+            for neighbor, step_cost in grid.neighbor_costs(current):
+                cost = step_cost + g[neighbor]
+                if cost < best:
+                    best = cost
+                    following = neighbor
+            if following == -1 or len(path) > grid.size:
+                return []
+            current = following
+            path.append(current)
+        return path
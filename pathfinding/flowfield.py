@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+"""
+Flow fields
+
+Description:
+    When a crowd heads for one target, one BFS per agent repeats the same work
+    over and over. A FlowField runs a single BFS outwards from the goal over
+    the whole grid and keeps, for every cell, its distance in steps to the
+    goal and the direction of its next step. Any agent then gets its next
+    step with one lookup, wherever it stands. Like BFS the field counts steps
+    and ignores movement costs.
+
+    The BFS runs on the neighbor masks of the grid. With NumPy installed a
+    large frontier is expanded at once with array operations, a small one
+    (e.g. in the corridors of a maze, where vector calls would cost more than
+    they save) cell by cell. Without NumPy every layer is expanded cell by
+    cell, still only on flat arrays.
+
+    The field is a snapshot of the grid when it was built. Call build() again
+    after walls changed.
+
+Usage:
+    field = FlowField(grid, (0, 0))
+    field.distance((5, 7))    # steps to the goal, -1 if it can't be reached
+    field.next_step((5, 7))   # (row, col) to move to, None at the goal
+    field.path((5, 7))        # the whole path to the goal
+"""
+# Libraries ###################################################################
+from array import array
+
+from .grid import UP, DOWN, LEFT, RIGHT, UP_LEFT, UP_RIGHT, DOWN_LEFT, DOWN_RIGHT, WALL, _numpy, as_grid
+from .search import _check_positions
+
+# Variables ###################################################################
+# Frontiers smaller than this are expanded cell by cell even with NumPy
+VECTOR_FRONTIER = 64
+
+# Flow Field Class ############################################################
+class FlowField:
+    def __init__(self, grid, goal, use_numpy=True):
+        self.grid = as_grid(grid)
+        _check_positions(self.grid, goal)
+        self.goal = self.grid.index(goal)
+        self.use_numpy = use_numpy and _numpy() is not None
+        self.build()
+    
+    def build(self):
+        grid = self.grid
+        grid.update_masks()
+        cols = grid.cols
+        # (mask bit, offset) of the steps in the order the grid returns them
+        self.directions = [(UP, -cols), (DOWN, cols), (LEFT, -1), (RIGHT, 1)]
+        if grid.diagonal:
+            self.directions += [(UP_LEFT, -cols - 1), (UP_RIGHT, -cols + 1),
+                                (DOWN_LEFT, cols - 1), (DOWN_RIGHT, cols + 1)]
+        self.offsets = dict(self.directions)
+        
+        if self.use_numpy:
+            self._build_numpy()
+        else:
+            self._build_arrays()
+    
+    # Building ################################################################
+    def _expand_cells(self, frontier, distance):
+        # Expands one BFS layer cell by cell, returns the next layer
+        masks = self.grid.masks
+        steps = self.grid.steps
+        distances = self.distances
+        layer = []
+        for current in frontier:
+            orthogonal, diagonal = steps[masks[current]]
+            for offsets in (orthogonal, diagonal):
+                for offset in offsets:
+                    neighbor = current + offset
+                    if distances[neighbor] < 0:
+                        distances[neighbor] = distance
+                        layer.append(neighbor)
+        return layer
+    
+    def _build_arrays(self):
+        grid = self.grid
+        masks = grid.masks
+        self.distances = distances = array("i", [-1]) * grid.size
+        self.flow = flow = bytearray(grid.size)
+        if grid.cells[self.goal] & WALL:
+            return
+        
+        distances[self.goal] = 0
+        frontier = [self.goal]
+        distance = 0
+        while frontier:
+            distance += 1
+            frontier = self._expand_cells(frontier, distance)
+        
+        # The next step of a cell is its first neighbor one step closer
+        for index in range(grid.size):
+            distance = distances[index]
+            if distance <= 0:
+                continue
+            mask = masks[index]
+            for bit, offset in self.directions:
+                if mask & bit and distances[index + offset] == distance - 1:
+                    flow[index] = bit
+                    break
+    
+    def _build_numpy(self):
+        np = _numpy()
+        grid = self.grid
+        masks = np.frombuffer(grid.masks, dtype=np.uint8)
+        self.distances = distances = np.full(grid.size, -1, dtype=np.int32)
+        self.flow = flow = np.zeros(grid.size, dtype=np.uint8)
+        if grid.cells[self.goal] & WALL:
+            return
+        
+        distances[self.goal] = 0
+        frontier = [self.goal]
+        distance = 0
+        while len(frontier):
+            distance += 1
+            if len(frontier) < VECTOR_FRONTIER:
+                frontier = self._expand_cells(frontier, distance)
+                continue
+            
+            # Every cell of the frontier steps in every free direction at once
+            frontier = np.asarray(frontier, dtype=np.int64)
+            frontier_masks = masks[frontier]
+            layer = np.concatenate([frontier[(frontier_masks & bit) != 0] + offset
+                                    for bit, offset in self.directions])
+            layer = np.unique(layer[distances[layer] < 0])
+            distances[layer] = distance
+            frontier = layer.tolist() if len(layer) < VECTOR_FRONTIER else layer
+        
+        # The next step of a cell is its first neighbor one step closer
+        remaining = distances > 0
+        for bit, offset in self.directions:
+            cells = np.nonzero(remaining & ((masks & bit) != 0))[0]
+            cells = cells[distances[cells + offset] == distances[cells] - 1]
+            flow[cells] = bit
+            remaining[cells] = False
+    
+    # Lookups #################################################################
+    def _index(self, position):
+        _check_positions(self.grid, position)
+        return self.grid.index(position)
+    
+    def distance(self, position):
+        return int(self.distances[self._index(position)])
+    
+    def next_step(self, position):
+        index = self._index(position)
+        bit = self.flow[index]
+        if not bit:
+            return None
+        return self.grid.position(index + self.offsets[bit])
+    
+    def path(self, position):
+        # Follows the field to the goal, empty if the goal can't be reached
+        index = self._index(position)
+        if self.distances[index] < 0:
+            return []
+        
+        path = [index]
+        while index != self.goal:
+            index += self.offsets[self.flow[index]]
+            path.append(index)
+        return [self.grid.position(index) for index in path]
@@ -0,0 +1,394 @@
+# -*- coding: utf-8 -*-
+"""
+Compact grid store
+
+Description:
+    A grid of rows x cols cells kept in one flat bytearray, one state byte
+    per cell. Cells are addressed either by (row, col) position or by their
+    flat index (row * cols + col), which is what the searches use internally.
+
+    Next to the state bytes every cell has a movement cost (1 - 255) in a
+    second bytearray: the cost of stepping onto that cell, e.g. 1 for a road
+    and 5 for mud. Dijkstra's algorithm and A* honor the costs, the other
+    searches treat every step as 1.
+
+Movement:
+    By default a cell is connected to its 4 orthogonal neighbors. With
+    diagonal=True the grid is 8-connected: diagonal steps cost DIAGONAL_COST
+    times the cell cost and may not cut the corner of a wall, i.e. both
+    orthogonal cells next to the diagonal step have to be free.
+
+Cell state flags:
+    WALL     - the cell is an obstacle
+    VISITED  - the cell was expanded by the last search
+    IN_QUEUE - the cell was added to the frontier of the last search
+    PATH     - the cell is on the path found by the last search
+
+Change listeners:
+    Planners which keep state between queries (HPA*, D* Lite, caches, ...)
+    register a listener with add_listener. It is called with the index of
+    every cell whose wall flag or cost is changed through set_wall, set_cost
+    or reset, and with None when the whole grid changes through clear or
+    set_cells.
+    Writing to cells or costs directly bypasses the listeners and the
+    cached min_cost.
+
+Neighbor masks:
+    The free neighbors of every cell are cached as one byte of direction bits
+    in masks, so neighbors() is a table lookup instead of eight wall checks.
+    The masks are built on first use and kept up to date incrementally: a
+    wall change only marks its cell dirty, and before the next lookup the
+    masks of the cells around the dirty ones are recomputed. Walls written to
+    cells directly need a call to walls_changed() to be seen. Searches which
+    read masks and the steps table themselves call update_masks() first.
+"""
+# Libraries ###################################################################
+import math
+
+# Cell State Flags ############################################################
+WALL = 1
+VISITED = 2
+IN_QUEUE = 4
+PATH = 8
+SEARCH_FLAGS = VISITED | IN_QUEUE | PATH
+
+# Translation table which clears the search flags but keeps the walls
+_CLEAR_SEARCH = bytes(value & ~SEARCH_FLAGS for value in range(256))
+
+# Cost factor of a diagonal step
+DIAGONAL_COST = math.sqrt(2)
+
+# Neighbor mask bits, in the order neighbors are returned
+UP = 1
+DOWN = 2
+LEFT = 4
+RIGHT = 8
+UP_LEFT = 16
+UP_RIGHT = 32
+DOWN_LEFT = 64
+DOWN_RIGHT = 128
+
+# Translation table giving 1 for free cells and 0 for walls
+_FREE = bytes(0 if value & WALL else 1 for value in range(256))
+
+# Translation table giving WALL for every nonzero byte
+_WALL_BYTES = bytes([0]) + bytes([WALL]) * 255
+
+# Translation table keeping only the wall flag of a cell
+_WALLS = bytes(value & WALL for value in range(256))
+
+def _numpy():
+    # NumPy is optional and takes longer to import than the whole package,
+    # so the modules which use it import it on first use. None without it.
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+def _as_bytes(buffer):
+    # The buffers of a grid may be memoryviews, e.g. over a mapped file,
+    # which have no translate() and no fast count() or "in"
+    if isinstance(buffer, (bytes, bytearray)):
+        return buffer
+    return bytes(buffer)
+
+# Grid Class ##################################################################
+class Grid:
+    def __init__(self, rows, cols, diagonal=False):
+        self.rows = rows
+        self.cols = cols
+        self.diagonal = diagonal
+        self.size = rows * cols
+        self.cells = bytearray(self.size)
+        self.costs = bytearray(b"\x01") * self.size
+        self.listeners = []
+        # Cheapest cost, None until first asked for
+        self._min_cost = None
+        
+        # Neighbor masks, None until first used, and the cells whose walls
+        # changed since they were computed
+        self.masks = None
+        self.dirty = set()
+        self.steps = self._step_table()
+    
+    @classmethod
+    def from_rows(cls, rows, costs=None, diagonal=False):
+        # Build a grid from a list of rows in which a truthy value marks a wall
+        # and optionally a list of rows with the movement cost of every cell
+        grid = cls(len(rows), len(rows[0]) if rows else 0, diagonal)
+        cells = grid.cells
+        index = 0
+        for row in rows:
+            for value in row:
+                if value:
+                    cells[index] = WALL
+                index += 1
+        
+        if costs is not None:
+            for row, row_costs in enumerate(costs):
+                for col, cost in enumerate(row_costs):
+                    grid.set_cost((row, col), cost)
+        return grid
+    
+    @classmethod
+    def from_buffers(cls, rows, cols, cells, costs, masks=None, diagonal=False):
+        # Grid over existing writable buffers of one byte per cell, e.g. a
+        # file mapped copy-on-write, without copying them. The searches and
+        # edits write straight into the buffers.
+        for buffer in (cells, costs) if masks is None else (cells, costs, masks):
+            buffer = memoryview(buffer)
+            if buffer.readonly:
+                raise ValueError("Grid buffers must be writable")
+            if buffer.nbytes != rows * cols:
+                raise ValueError("Expected %d cells for a %dx%d grid, got %d" % (rows * cols, rows, cols, buffer.nbytes))
+        grid = cls(0, 0, diagonal)
+        grid.rows = rows
+        grid.cols = cols
+        grid.size = rows * cols
+        grid.cells = cells
+        grid.costs = costs
+        grid.masks = masks
+        grid.steps = grid._step_table()
+        return grid
+    
+    def to_rows(self):
+        cells = self.cells
+        cols = self.cols
+        return [[cells[i] & WALL for i in range(start, start + cols)] for start in range(0, self.size, cols)]
+    
+    def index(self, position):
+        row, col = position
+        return row * self.cols + col
+    
+    def position(self, index):
+        return divmod(index, self.cols)
+    
+    def in_bounds(self, position):
+        row, col = position
+        return 0 <= row < self.rows and 0 <= col < self.cols
+    
+    def is_wall(self, position):
+        return bool(self.cells[self.index(position)] & WALL)
+    
+    def is_visited(self, position):
+        return bool(self.cells[self.index(position)] & VISITED)
+    
+    def is_in_queue(self, position):
+        return bool(self.cells[self.index(position)] & IN_QUEUE)
+    
+    def is_path(self, position):
+        return bool(self.cells[self.index(position)] & PATH)
+    
+    def add_listener(self, listener):
+        self.listeners.append(listener)
+    
+    def remove_listener(self, listener):
+        self.listeners.remove(listener)
+    
+    def _changed(self, index):
+        for listener in self.listeners:
+            listener(index)
+    
+    def walls_changed(self, index=None):
+        # Marks the neighbor masks around a cell, or all of them, as stale
+        if index is None:
+            self.masks = None
+            self.dirty.clear()
+        elif self.masks is not None:
+            self.dirty.add(index)
+    
+    def set_wall(self, position, wall=True):
+        index = self.index(position)
+        was_wall = self.cells[index] & WALL
+        if wall:
+            self.cells[index] = WALL
+        else:
+            self.cells[index] &= ~WALL
+        if bool(was_wall) != bool(wall):
+            self.walls_changed(index)
+            self._changed(index)
+    
+    def cost(self, position):
+        return self.costs[self.index(position)]
+    
+    def set_cost(self, position, cost):
+        if not 1 <= cost <= 255:
+            raise ValueError("Cell cost must be between 1 and 255, got %r" % cost)
+        index = self.index(position)
+        if self.costs[index] != cost:
+            self.costs[index] = cost
+            self._min_cost = None
+            self._changed(index)
+    
+    @property
+    def min_cost(self):
+        # Cheapest step on the grid, used to keep heuristics admissible.
+        # Looking for each cost in turn is a memchr per cost, which is much
+        # faster than min() going through every cell. Cached until a cost
+        # changes, as a mapped grid would copy its costs on every call.
+        if self._min_cost is None:
+            costs = _as_bytes(self.costs)
+            self._min_cost = next((cost for cost in range(1, 256) if cost in costs), 1)
+        return self._min_cost
+    
+    def reset(self, position):
+        index = self.index(position)
+        was_wall = self.cells[index] & WALL
+        changed = was_wall or self.costs[index] != 1
+        self.cells[index] = 0
+        self.costs[index] = 1
+        self._min_cost = None
+        if was_wall:
+            self.walls_changed(index)
+        if changed:
+            self._changed(index)
+    
+    def clear_search(self):
+        cells = self.cells
+        if isinstance(cells, bytearray):
+            cells[:] = cells.translate(_CLEAR_SEARCH)
+            return
+        
+        # Other buffers, e.g. a file mapped copy-on-write, would give every
+        # page a private copy when rewritten whole, so with NumPy only the
+        # cells the last search flagged are written
+        np = _numpy()
+        if np is None:
+            cells[:] = bytes(cells).translate(_CLEAR_SEARCH)
+            return
+        values = np.frombuffer(cells, dtype=np.uint8)
+        values[np.flatnonzero(values & SEARCH_FLAGS)] &= 255 & ~SEARCH_FLAGS
+    
+    def clear(self):
+        self.cells[:] = bytes(self.size)
+        self.costs[:] = bytearray(b"\x01") * self.size
+        self._min_cost = None
+        self.walls_changed()
+        self._changed(None)
+    
+    def set_cells(self, walls, costs=None):
+        # Replaces every cell at once, e.g. with a generated or loaded map.
+        # walls holds one byte per cell, nonzero for a wall, and costs the
+        # optional cost of every cell. The last search is cleared.
+        if len(walls) != self.size or (costs is not None and len(costs) != self.size):
+            raise ValueError("Expected %d cells for a %dx%d grid" % (self.size, self.rows, self.cols))
+        if costs is not None:
+            costs = bytes(costs)
+            if 0 in costs:
+                raise ValueError("Cell costs must be between 1 and 255")
+        self.cells[:] = bytes(walls).translate(_WALL_BYTES)
+        if costs is not None:
+            self.costs[:] = costs
+            self._min_cost = None
+        self.walls_changed()
+        self._changed(None)
+    
+    # Neighbor Masks ##########################################################
+    def _step_table(self):
+        # Mask -> (orthogonal offsets, diagonal offsets) of the free neighbors
+        cols = self.cols
+        orthogonal = ((UP, -cols), (DOWN, cols), (LEFT, -1), (RIGHT, 1))
+        diagonal = ((UP_LEFT, -cols - 1), (UP_RIGHT, -cols + 1),
+                    (DOWN_LEFT, cols - 1), (DOWN_RIGHT, cols + 1))
+        table = []
+        for mask in range(256):
+            table.append(([offset for bit, offset in orthogonal if mask & bit],
+                          [offset for bit, offset in diagonal if mask & bit] if self.diagonal else []))
+        return table
+    
+    def _build_masks(self):
+        # Works on the whole grid at once: the free flags of all cells form
+        # one big integer with a byte per cell, shifting it by a row or a
+        # column lines every cell up with its neighbor in that direction
+        size = self.size
+        cols = self.cols
+        free = int.from_bytes(_as_bytes(self.cells).translate(_FREE), "little")
+        not_first = int.from_bytes((b"\x00" + b"\x01" * (cols - 1)) * self.rows, "little")
+        not_last = int.from_bytes((b"\x01" * (cols - 1) + b"\x00") * self.rows, "little")
+        row = 8 * cols
+        
+        up = free << row
+        down = free >> row
+        left = (free << 8) & not_first
+        right = (free >> 8) & not_last
+        up_left = (free << (row + 8)) & not_first & up & left
+        up_right = (free << (row - 8)) & not_last & up & right
+        down_left = (free >> (row - 8)) & not_first & down & left
+        down_right = (free >> (row + 8)) & not_last & down & right
+        
+        masks = (up | down << 1 | left << 2 | right << 3 | up_left << 4 |
+                 up_right << 5 | down_left << 6 | down_right << 7)
+        self.masks = bytearray((masks & ((1 << 8 * size) - 1)).to_bytes(size, "little"))
+        self.dirty.clear()
+    
+    def _cell_mask(self, index):
+        cells = self.cells
+        cols = self.cols
+        row, col = divmod(index, cols)
+        up = row > 0 and not cells[index - cols] & WALL
+        down = row < self.rows - 1 and not cells[index + cols] & WALL
+        left = col > 0 and not cells[index - 1] & WALL
+        right = col < cols - 1 and not cells[index + 1] & WALL
+        
+        mask = up * UP | down * DOWN | left * LEFT | right * RIGHT
+        # Diagonals are only free when both orthogonal cells next to them are,
+        # so a step never cuts the corner of a wall
+        if up and left and not cells[index - cols - 1] & WALL:
+            mask |= UP_LEFT
+        if up and right and not cells[index - cols + 1] & WALL:
+            mask |= UP_RIGHT
+        if down and left and not cells[index + cols - 1] & WALL:
+            mask |= DOWN_LEFT
+        if down and right and not cells[index + cols + 1] & WALL:
+            mask |= DOWN_RIGHT
+        return mask
+    
+    def update_masks(self):
+        # A wall changes the masks of the cells around it, including the
+        # diagonal steps whose corner it is. Many changes at once, e.g. a new
+        # maze, are cheaper to handle with a full rebuild.
+        if self.masks is None or len(self.dirty) > self.size // 64:
+            self._build_masks()
+            return
+        
+        masks = self.masks
+        rows = self.rows
+        cols = self.cols
+        region = set()
+        for index in self.dirty:
+            row, col = divmod(index, cols)
+            for near_row in range(max(row - 1, 0), min(row + 2, rows)):
+                start = near_row * cols
+                region.update(range(start + max(col - 1, 0), start + min(col + 2, cols)))
+        for index in region:
+            masks[index] = self._cell_mask(index)
+        self.dirty.clear()
+    
+    def _adjacent(self, index):
+        # Returns the free orthogonal and diagonal neighbors of a cell
+        if self.dirty or self.masks is None:
+            self.update_masks()
+        orthogonal, diagonal = self.steps[self.masks[index]]
+        return [index + offset for offset in orthogonal], [index + offset for offset in diagonal]
+    
+    def neighbors(self, index):
+        orthogonal, diagonal = self._adjacent(index)
+        if diagonal:
+            orthogonal.extend(diagonal)
+        return orthogonal
+    
+    def neighbor_costs(self, index):
+        # Returns (neighbor, cost of the step) pairs
+        costs = self.costs
+        orthogonal, diagonal = self._adjacent(index)
+        steps = [(neighbor, costs[neighbor]) for neighbor in orthogonal]
+        for neighbor in diagonal:
+            steps.append((neighbor, costs[neighbor] * DIAGONAL_COST))
+        return steps
+
+def as_grid(grid):
+    # Searches accept either a Grid or a plain list of rows
+    if isinstance(grid, Grid):
+        return grid
+    return Grid.from_rows(grid)
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+"""
+Heuristics for A*
+
+Description:
+    Distance estimates between two (row, col) positions. Each one is scaled by
+    the cheapest step on the grid (min_cost) so it stays admissible on
+    weighted terrain. The heuristic should match the movement model of the
+    grid:
+        manhattan - 4-connected grids
+        octile    - 8-connected grids with diagonal steps of sqrt(2)
+        chebyshev - 8-connected grids, weaker than octile but admissible
+        euclidean - admissible for both, weaker than the ones above
+    Manhattan distance overestimates on an 8-connected grid, so A* is no
+    longer guaranteed to find the shortest path when it is used there.
+"""
+# Libraries ###################################################################
+import math
+
+from .grid import DIAGONAL_COST
+
+# Heuristic Functions #########################################################
+def manhattan(p1, p2, min_cost=1):
+    x1, y1 = p1
+    x2, y2 = p2
+    return (abs(x1 - x2) + abs(y1 - y2)) * min_cost
+
+def octile(p1, p2, min_cost=1):
+    # Diagonal steps while both coordinates differ, straight steps after that
+    dx = abs(p1[0] - p2[0])
+    dy = abs(p1[1] - p2[1])
+    if dx < dy:
+        dx, dy = dy, dx
+    return (dx + (DIAGONAL_COST - 1) * dy) * min_cost
+
+def chebyshev(p1, p2, min_cost=1):
+    return max(abs(p1[0] - p2[0]), abs(p1[1] - p2[1])) * min_cost
+
+def euclidean(p1, p2, min_cost=1):
+    return math.hypot(p1[0] - p2[0], p1[1] - p2[1]) * min_cost
+
+HEURISTICS = {
+    "manhattan": manhattan,
+    "octile": octile,
+    "chebyshev": chebyshev,
+    "euclidean": euclidean,
+}
+
+def get_heuristic(heuristic, diagonal=False):
+    # Accepts a heuristic name, a function or None for the heuristic which
+    # matches the movement model of the grid
+    if heuristic is None:
+        heuristic = "octile" if diagonal else "manhattan"
+    if callable(heuristic):
+        return heuristic
+    if heuristic not in HEURISTICS:
+        raise ValueError("Unknown heuristic: %s" % heuristic)
+    return HEURISTICS[heuristic]
@@ -0,0 +1,365 @@
+# -*- coding: utf-8 -*-
+"""
+Hierarchical path finding (HPA*)
+
+Description:
+    Long queries on big maps spend most of their time expanding cells which
+    are nowhere near the final path. HPA* splits the grid into square clusters
+    and precomputes a small abstract graph:
+        - entrances: on every border between two clusters, each run of free
+          cell pairs gets one transition in its middle, or one at each end
+          when the run is ENTRANCE_SPLIT cells or longer
+        - inter edges: the single step across the border of a transition
+        - intra edges: the cheapest path inside a cluster between every two
+          entrances of that cluster
+    A query links start and end to the entrances of their clusters, runs A*
+    on the abstract graph and then refines every abstract edge into cells
+    with a search restricted to one cluster. Paths are close to, but not
+    always exactly, the shortest ones.
+
+    The pathfinder listens to changes of the grid. A change inside a cluster
+    only rebuilds the intra edges of that cluster, a change on a cluster
+    border also rebuilds the entrances of that border and the intra edges of
+    the cluster on its other side. Rebuilding is deferred until the next query.
+
+Usage:
+    pathfinder = HierarchicalPathfinder(grid, cluster_size=16)
+    result = pathfinder.find_path((0, 0), (999, 999))
+    grid.set_wall((10, 10))   # marks the cluster for rebuilding
+    pathfinder.close()        # stops listening to the grid
+"""
+# Libraries ###################################################################
+from heapq import heappush, heappop
+import time
+
+from .grid import DIAGONAL_COST, WALL, as_grid
+from .heuristics import get_heuristic
+from .search import SearchResult, _check_positions, construct_path
+
+# Variables ###################################################################
+ENTRANCE_SPLIT = 6
+
+# Hierarchical Pathfinder Class ###############################################
+class HierarchicalPathfinder:
+    def __init__(self, grid, cluster_size=16, heuristic=None):
+        if cluster_size < 2:
+            raise ValueError("Cluster size must be at least 2, got %r" % cluster_size)
+        self.grid = as_grid(grid)
+        self.cluster_size = cluster_size
+        self.cluster_rows = -(-self.grid.rows // cluster_size)
+        self.cluster_cols = -(-self.grid.cols // cluster_size)
+        self.heuristic = get_heuristic(heuristic, self.grid.diagonal)
+        
+        # Abstract graph: node -> {node: cost}, nodes are cell indices
+        self.graph = {}
+        # Border (cluster, cluster) -> list of (cell, cell) transitions
+        self.transitions = {}
+        # Cluster -> set of its entrance nodes
+        self.entrances = {}
+        
+        self.dirty_borders = set()
+        self.dirty_clusters = set()
+        self.dirty_all = False
+        self.grid.add_listener(self._cell_changed)
+        self.build()
+    
+    def close(self):
+        self.grid.remove_listener(self._cell_changed)
+    
+    # Clusters ################################################################
+    def cluster_of(self, index):
+        row, col = divmod(index, self.grid.cols)
+        return (row // self.cluster_size) * self.cluster_cols + col // self.cluster_size
+    
+    def _bounds(self, cluster):
+        # (first row, last row + 1, first col, last col + 1) of a cluster
+        size = self.cluster_size
+        cluster_row, cluster_col = divmod(cluster, self.cluster_cols)
+        row = cluster_row * size
+        col = cluster_col * size
+        return row, min(row + size, self.grid.rows), col, min(col + size, self.grid.cols)
+    
+    def _cluster_borders(self, cluster):
+        # Borders are (cluster, cluster to the right or below)
+        cluster_row, cluster_col = divmod(cluster, self.cluster_cols)
+        borders = []
+        if cluster_col > 0:
+            borders.append((cluster - 1, cluster))
+        if cluster_col < self.cluster_cols - 1:
+            borders.append((cluster, cluster + 1))
+        if cluster_row > 0:
+            borders.append((cluster - self.cluster_cols, cluster))
+        if cluster_row < self.cluster_rows - 1:
+            borders.append((cluster, cluster + self.cluster_cols))
+        return borders
+    
+    # Building ################################################################
+    def build(self):
+        self.graph = {}
+        self.transitions = {}
+        self.entrances = {}
+        
+        clusters = range(self.cluster_rows * self.cluster_cols)
+        for cluster in clusters:
+            for border in self._cluster_borders(cluster):
+                if border[0] == cluster:
+                    self._build_border(border)
+        for cluster in clusters:
+            self._build_cluster(cluster)
+        
+        self.dirty_borders.clear()
+        self.dirty_clusters.clear()
+        self.dirty_all = False
+    
+    def update(self):
+        # Rebuilds what changed since the last query
+        if self.dirty_all:
+            self.build()
+            return
+        
+        for border in self.dirty_borders:
+            self._build_border(border)
+            self.dirty_clusters.update(border)
+        for cluster in self.dirty_clusters:
+            self._build_cluster(cluster)
+        
+        self.dirty_borders.clear()
+        self.dirty_clusters.clear()
+    
+    def _cell_changed(self, index):
+        if index is None:
+            self.dirty_all = True
+            return
+        
+        size = self.cluster_size
+        row, col = divmod(index, self.grid.cols)
+        cluster = self.cluster_of(index)
+        self.dirty_clusters.add(cluster)
+        
+        # Cells on the edge of a cluster also change the entrances of the border
+        cluster_row, cluster_col = divmod(cluster, self.cluster_cols)
+        if col % size == 0 and cluster_col > 0:
+            self.dirty_borders.add((cluster - 1, cluster))
+        if col % size == size - 1 and cluster_col < self.cluster_cols - 1:
+            self.dirty_borders.add((cluster, cluster + 1))
+        if row % size == 0 and cluster_row > 0:
+            self.dirty_borders.add((cluster - self.cluster_cols, cluster))
+        if row % size == size - 1 and cluster_row < self.cluster_rows - 1:
+            self.dirty_borders.add((cluster, cluster + self.cluster_cols))
+    
+    def _add_edge(self, node, other, cost):
+        self.graph.setdefault(node, {})[other] = cost
+    
+    def _remove_edge(self, node, other):
+        edges = self.graph.get(node)
+        if edges is not None:
+            edges.pop(other, None)
+            if not edges:
+                del self.graph[node]
+    
+    def _build_border(self, border):
+        grid = self.grid
+        cells = grid.cells
+        costs = grid.costs
+        cols = grid.cols
+        
+        for node, other in self.transitions.pop(border, ()):
+            self._remove_edge(node, other)
+            self._remove_edge(other, node)
+        
+        first, second = border
+        row_start, row_end, col_start, col_end = self._bounds(first)
+        if first // self.cluster_cols == second // self.cluster_cols:
+            # Vertical border, pairs of cells side by side
+            pairs = [(row * cols + col_end - 1, row * cols + col_end) for row in range(row_start, row_end)]
+        else:
+            # Horizontal border, pairs of cells above each other
+            pairs = [((row_end - 1) * cols + col, row_end * cols + col) for col in range(col_start, col_end)]
+        
+        transitions = []
+        run = []
+        for pair in pairs + [None]:
+            if pair is not None and not cells[pair[0]] & WALL and not cells[pair[1]] & WALL:
+                run.append(pair)
+                continue
+            if len(run) >= ENTRANCE_SPLIT:
+                transitions.append(run[0])
+                transitions.append(run[-1])
+            elif run:
+                transitions.append(run[len(run) // 2])
+            run = []
+        
+        self.transitions[border] = transitions
+        for node, other in transitions:
+            self._add_edge(node, other, costs[other])
+            self._add_edge(other, node, costs[node])
+    
+    def _build_cluster(self, cluster):
+        # Drop the old intra edges of the cluster
+        for node in self.entrances.get(cluster, ()):
+            edges = self.graph.get(node)
+            if edges is not None:
+                for other in [other for other in edges if self.cluster_of(other) == cluster]:
+                    self._remove_edge(node, other)
+        
+        entrances = set()
+        for border in self._cluster_borders(cluster):
+            for node, other in self.transitions.get(border, ()):
+                entrances.add(node if self.cluster_of(node) == cluster else other)
+        self.entrances[cluster] = entrances
+        
+        if len(entrances) < 2:
+            return
+        steps = self._cluster_steps(cluster)
+        for node in entrances:
+            distances = self._local_search(node, steps, targets=entrances)[0]
+            for other in entrances:
+                if other != node and other in distances:
+                    self._add_edge(node, other, distances[other])
+    
+    # Searching ###############################################################
+    def _cluster_steps(self, cluster, reverse=False):
+        # Free cells of a cluster -> (neighbor, cost of the step) pairs inside
+        # it. With reverse=True every step is turned around, so a search from
+        # a cell gives the distances from every other cell to it instead.
+        grid = self.grid
+        cells = grid.cells
+        costs = grid.costs
+        cols = grid.cols
+        row_start, row_end, col_start, col_end = self._bounds(cluster)
+        first = row_start * cols
+        last = row_end * cols
+        
+        steps = {}
+        for row in range(row_start, row_end):
+            for index in range(row * cols + col_start, row * cols + col_end):
+                if cells[index] & WALL:
+                    continue
+                inside = []
+                for neighbor, step_cost in grid.neighbor_costs(index):
+                    if first <= neighbor < last and col_start <= neighbor % cols < col_end:
+                        if reverse:
+                            # Going backwards the step enters index, not
+                            # neighbor. Offsets are ambiguous on grids two
+                            # cells wide, so the row and column tell a
+                            # diagonal step apart.
+                            if neighbor // cols == row or neighbor % cols == index % cols:
+                                step_cost = costs[index]
+                            else:
+                                step_cost = costs[index] * DIAGONAL_COST
+                        inside.append((neighbor, step_cost))
+                steps[index] = inside
+        return steps
+    
+    def _local_search(self, source, steps, target=None, targets=None):
+        # Dijkstra's algorithm over the steps of one cluster, stopping early
+        # once target or every cell of targets is settled
+        remaining = len(targets) if targets else -1
+        distances = {source: 0}
+        previous = {source: source}
+        queue = [(0, source)]
+        
+        while queue:
+            distance, current = heappop(queue)
+            if distance > distances[current]:
+                continue
+            if current == target:
+                break
+            if remaining > 0 and current in targets:
+                remaining -= 1
+                if not remaining:
+                    break
+            
+            for neighbor, step_cost in steps[current]:
+                neighbor_distance = distance + step_cost
+                if neighbor_distance < distances.get(neighbor, float("inf")):
+                    distances[neighbor] = neighbor_distance
+                    previous[neighbor] = current
+                    heappush(queue, (neighbor_distance, neighbor))
+        return distances, previous
+    
+    def find_path(self, start, end):
+        started = time.perf_counter()
+        grid = self.grid
+        _check_positions(grid, start, end)
+        self.update()
+        start = grid.index(start)
+        end = grid.index(end)
+        stats = {"expanded": 0, "abstract_nodes": len(self.graph)}
+        
+        if grid.cells[start] & WALL or grid.cells[end] & WALL:
+            return self._result([], stats, started)
+        if start == end:
+            return self._result([start], stats, started, cost=0)
+        
+        # Link start and end to the entrances of their clusters
+        start_cluster = self.cluster_of(start)
+        end_cluster = self.cluster_of(end)
+        temporary = {start: {}}
+        
+        from_start = self._local_search(start, self._cluster_steps(start_cluster))[0]
+        for node in self.entrances[start_cluster]:
+            if node != start and node in from_start:
+                temporary[start][node] = from_start[node]
+        if start_cluster == end_cluster and end in from_start:
+            temporary[start][end] = from_start[end]
+        
+        to_end = self._local_search(end, self._cluster_steps(end_cluster, reverse=True))[0]
+        for node in self.entrances[end_cluster]:
+            if node != end and node in to_end:
+                temporary.setdefault(node, {})[end] = to_end[node]
+        
+        # A* on the abstract graph
+        min_cost = grid.min_cost
+        end_position = grid.position(end)
+        g_score = {start: 0}
+        previous = {start: start}
+        closed = set()
+        h_score = self.heuristic(grid.position(start), end_position, min_cost)
+        queue = [(h_score, h_score, start)]
+        
+        while queue:
+            current = heappop(queue)[2]
+            if current in closed:
+                continue
+            closed.add(current)
+            stats["expanded"] += 1
+            
+            if current == end:
+                abstract_path = construct_path(previous, end, start)
+                stats["abstract_path"] = len(abstract_path)
+                return self._result(self._refine(abstract_path), stats, started, cost=g_score[end])
+            
+            current_g_score = g_score[current]
+            for edges in (self.graph.get(current), temporary.get(current)):
+                if not edges:
+                    continue
+                for neighbor, cost in edges.items():
+                    temp_g_score = current_g_score + cost
+                    if neighbor not in closed and temp_g_score < g_score.get(neighbor, float("inf")):
+                        g_score[neighbor] = temp_g_score
+                        previous[neighbor] = current
+                        h_score = self.heuristic(grid.position(neighbor), end_position, min_cost)
+                        heappush(queue, (round(temp_g_score + h_score, 9), h_score, neighbor))
+        return self._result([], stats, started)
+    
+    def _refine(self, abstract_path):
+        # Turns abstract edges back into cells: inter edges are a single step,
+        # everything else is searched again inside its cluster
+        path = abstract_path[:1]
+        steps = {}
+        for node, following in zip(abstract_path, abstract_path[1:]):
+            cluster = self.cluster_of(node)
+            if cluster != self.cluster_of(following):
+                path.append(following)
+            else:
+                if cluster not in steps:
+                    steps[cluster] = self._cluster_steps(cluster)
+                previous = self._local_search(node, steps[cluster], target=following)[1]
+                path.extend(construct_path(previous, following, node)[1:])
+        return path
+    
+    def _result(self, path, stats, started, **counters):
+        stats.update(counters)
+        stats["elapsed"] = time.perf_counter() - started
+        return SearchResult(bool(path), [self.grid.position(index) for index in path], stats)
@@ -0,0 +1,238 @@
+# -*- coding: utf-8 -*-
+"""
+Landmark heuristic (ALT)
+
+Description:
+    Manhattan and octile distance ignore walls, so in a maze A* expands almost
+    as many cells as Dijkstra's algorithm. ALT (A*, Landmarks, Triangle
+    inequality) precomputes the exact distance from a few landmark cells to
+    every cell and back. For any landmark L the triangle inequality gives
+    lower bounds on the distance from a cell v to the end e:
+        d(v, e) >= d(L, e) - d(L, v)
+        d(v, e) >= d(v, L) - d(e, L)
+    The largest bound, or the geometric heuristic if that is larger, is used.
+    Landmarks are picked far apart: each new one is the reachable cell
+    farthest from the ones before it.
+
+    Tables hold one int per cell on 4-connected grids and one double per cell
+    otherwise, -1 for cells a landmark can't reach. When all cells cost the
+    same the distances are symmetric and one table per landmark is enough.
+    For every end only the ACTIVE landmarks giving the best bound at the
+    start are consulted, which keeps the heuristic cheap to evaluate.
+
+    Adding walls only makes paths longer, so the tables stay admissible. Any
+    other change marks them stale and they are computed again (for the same
+    landmarks) the next time the heuristic is used.
+
+Usage:
+    landmarks = Landmarks(grid, count=8)
+    result = a_star(grid, (0, 0), (99, 99), heuristic=landmarks)
+    landmarks.save("level1.alt")
+    landmarks = Landmarks.load("level1.alt", grid)
+"""
+# Libraries ###################################################################
+from array import array
+from collections import deque
+from heapq import heappush, heappop
+import random
+import struct
+import zlib
+
+from .grid import DIAGONAL_COST, WALL, _WALLS, _as_bytes, as_grid
+from .heuristics import get_heuristic
+
+# Variables ###################################################################
+# Landmarks consulted per end cell
+ACTIVE = 4
+
+# File header: magic, rows, cols, diagonal, symmetric, landmark count, and the
+# checksum of the walls and costs the tables were computed for
+_MAGIC = b"PFALT1\n"
+_HEADER = struct.Struct("<IIBBII")
+
+# Landmarks Class #############################################################
+class Landmarks:
+    def __init__(self, grid, count=8, seed=None, tables=None):
+        self.grid = as_grid(grid)
+        if count < 1:
+            raise ValueError("Landmark count must be at least 1, got %r" % count)
+        self.count = count
+        self.base = get_heuristic(None, self.grid.diagonal)
+        self.stale = False
+        self._end = None
+        self.grid.add_listener(self._cell_changed)
+        
+        if tables is None:
+            self._select(random.Random(seed))
+        else:
+            self.landmarks, self.symmetric, self.forward, self.backward = tables
+    
+    def close(self):
+        self.grid.remove_listener(self._cell_changed)
+    
+    def _cell_changed(self, index):
+        if index is None or not self.grid.cells[index] & WALL:
+            self.stale = True
+    
+    def _checksum(self):
+        grid = self.grid
+        return zlib.crc32(grid.costs, zlib.crc32(_as_bytes(grid.cells).translate(_WALLS)))
+    
+    # Distance Tables #########################################################
+    def _distances(self, source, reverse=False):
+        # Cost of the cheapest path from source to every cell, or from every
+        # cell to source with reverse=True, -1 where there is none
+        grid = self.grid
+        masks = grid.masks
+        steps = grid.steps
+        costs = grid.costs
+        
+        if self.symmetric and not grid.diagonal:
+            # Every step costs the same, a BFS counts the steps
+            step_cost = costs[source]
+            distances = array("i", [-1]) * grid.size
+            distances[source] = 0
+            queue = deque([source])
+            while queue:
+                current = queue.popleft()
+                distance = distances[current] + step_cost
+                for offset in steps[masks[current]][0]:
+                    neighbor = current + offset
+                    if distances[neighbor] < 0:
+                        distances[neighbor] = distance
+                        queue.append(neighbor)
+            return distances
+        
+        distances = array("d" if grid.diagonal else "i", [-1]) * grid.size
+        distances[source] = 0
+        queue = [(0, source)]
+        while queue:
+            distance, current = heappop(queue)
+            if distance > distances[current]:
+                continue
+            orthogonal, diagonal = steps[masks[current]]
+            for offsets, factor in ((orthogonal, 1), (diagonal, DIAGONAL_COST)):
+                for offset in offsets:
+                    neighbor = current + offset
+                    # Going backwards the step enters current, not neighbor
+                    neighbor_distance = distance + (costs[current] if reverse else costs[neighbor]) * factor
+                    if distances[neighbor] < 0 or neighbor_distance < distances[neighbor]:
+                        distances[neighbor] = neighbor_distance
+                        heappush(queue, (neighbor_distance, neighbor))
+        return distances
+    
+    def _compute(self, forward=None):
+        # forward may hold the tables from the landmarks already
+        grid = self.grid
+        grid.update_masks()
+        self.symmetric = grid.min_cost == max(grid.costs, default=1)
+        self.forward = forward or [self._distances(landmark) for landmark in self.landmarks]
+        if self.symmetric:
+            self.backward = self.forward
+        else:
+            self.backward = [self._distances(landmark, reverse=True) for landmark in self.landmarks]
+        self.stale = False
+        self._end = None
+    
+    def _select(self, rng):
+        # Farthest point selection, starting from the cell farthest from a
+        # random free cell
+        grid = self.grid
+        grid.update_masks()
+        self.symmetric = grid.min_cost == max(grid.costs, default=1)
+        free = [index for index in range(grid.size) if not grid.cells[index] & WALL]
+        self.landmarks = []
+        forward = []
+        if not free:
+            self._compute()
+            return
+        
+        nearest = self._distances(rng.choice(free))
+        for number in range(self.count):
+            farthest = max(range(grid.size), key=nearest.__getitem__)
+            if nearest[farthest] <= 0:
+                break
+            self.landmarks.append(farthest)
+            forward.append(self._distances(farthest))
+            if number == 0:
+                nearest = forward[0]
+            else:
+                nearest = array(nearest.typecode, (min(a, b) for a, b in zip(nearest, forward[-1])))
+        self._compute(forward)
+    
+    def update(self):
+        if self.stale:
+            self._compute()
+    
+    # Heuristic ###############################################################
+    def _activate(self, start, end):
+        # Picks the landmarks with the best bound from start to end
+        bounds = []
+        for landmark, (forward, backward) in enumerate(zip(self.forward, self.backward)):
+            if forward[end] >= 0 and forward[start] >= 0:
+                bounds.append((max(forward[end] - forward[start], backward[start] - backward[end]), landmark))
+        bounds.sort(reverse=True)
+        self.active = [(self.forward[landmark], self.backward[landmark],
+                        self.forward[landmark][end], self.backward[landmark][end])
+                       for _, landmark in bounds[:ACTIVE]]
+        self._end = end
+    
+    def __call__(self, p1, p2, min_cost=1):
+        self.update()
+        cols = self.grid.cols
+        index = p1[0] * cols + p1[1]
+        end = p2[0] * cols + p2[1]
+        if end != self._end:
+            self._activate(index, end)
+        
+        best = self.base(p1, p2, min_cost)
+        for forward, backward, forward_end, backward_end in self.active:
+            if forward[index] < 0:
+                continue
+            bound = forward_end - forward[index]
+            if bound > best:
+                best = bound
+            bound = backward[index] - backward_end
+            if bound > best:
+                best = bound
+        return best
+    
+    # Persistence #############################################################
+    def save(self, path):
+        self.update()
+        grid = self.grid
+        with open(path, "wb") as file:
+            file.write(_MAGIC)
+            # New walls keep the tables admissible, so they are saved for the
+            # walls the grid has now
+            file.write(_HEADER.pack(grid.rows, grid.cols, grid.diagonal, self.symmetric,
+                                    len(self.landmarks), self._checksum()))
+            array("i", self.landmarks).tofile(file)
+            for table in self.forward + ([] if self.symmetric else self.backward):
+                table.tofile(file)
+    
+    @classmethod
+    def load(cls, path, grid):
+        grid = as_grid(grid)
+        with open(path, "rb") as file:
+            if file.read(len(_MAGIC)) != _MAGIC:
+                raise ValueError("%s is not a landmark file" % path)
+            rows, cols, diagonal, symmetric, count, checksum = _HEADER.unpack(file.read(_HEADER.size))
+            if (rows, cols, bool(diagonal)) != (grid.rows, grid.cols, grid.diagonal):
+                raise ValueError("Landmark file %s was computed for another grid size" % path)
+            
+            landmarks = array("i")
+            landmarks.fromfile(file, count)
+            tables = []
+            for _ in range(count if symmetric else 2 * count):
+                table = array("d" if diagonal else "i")
+                table.fromfile(file, grid.size)
+                tables.append(table)
+        
+        forward = tables[:count]
+        backward = forward if symmetric else tables[count:]
+        landmarks = cls(grid, max(count, 1), tables=(list(landmarks), bool(symmetric), forward, backward))
+        if checksum != landmarks._checksum():
+            landmarks.close()
+            raise ValueError("Landmark file %s was computed for other walls or costs" % path)
+        return landmarks
@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+"""
+Map files
+
+Description:
+    Saves and loads grids in a compact binary format made to be memory mapped,
+    and imports and exports the .map files of the Moving AI benchmark sets.
+
+    A binary map file is a HEADER_SIZE byte header followed by three arrays
+    of one byte per cell, in row order:
+        magic       b"PFMAP1\\n"
+        header      rows, cols (uint32, little endian) and diagonal (uint8)
+        walls       1 for a wall, 0 for a free cell
+        costs       movement cost of every cell (1 - 255)
+        masks       neighbor masks of every cell, see grid.py
+    The arrays start at HEADER_SIZE, HEADER_SIZE + rows * cols and
+    HEADER_SIZE + 2 * rows * cols, so they can also be opened directly with
+    numpy.memmap.
+
+    load_map() maps the file and by default copies the arrays into a normal
+    Grid, which is a plain memory copy without any work per cell, and the
+    stored masks spare building them. With mapped=True nothing is copied:
+    the grid reads the arrays straight from the mapped file and pages are
+    loaded as they are touched, so a map of any size opens at once. The file
+    is mapped copy-on-write, so searches and edits work on such a grid like
+    on any other, but the pages they write to are copied into memory and the
+    file itself never changes. save_map() writes the edits back.
+
+    Each single search (find_path, a_star, ...) allocates buffers of the
+    grid size. On a map of millions of cells that costs far more than a short
+    search does. A Workspace (see batch.py) allocates them once and answers
+    repeated queries in the time the search itself takes.
+
+    Moving AI maps mark passable cells with ".", "G" and "S" (swamp), every
+    other character (walls "@" and "O", trees "T", water "W") is imported as
+    a wall. Every benchmark map is of type octile, which only names the map
+    format and says nothing about how agents move on it: the benchmarks are
+    run both 4-connected and 8-connected. So load_movingai() takes the
+    connectivity explicitly, and save_movingai() writes type octile for any
+    grid. 8-connected grids move like the octile benchmarks, diagonal steps
+    may not cut corners.
+
+Usage:
+    save_map(grid, "level1.pfmap")
+    grid = load_map("level1.pfmap")
+    grid = load_map("level1.pfmap", mapped=True)
+    results = find_paths(grid, pairs)
+    grid = load_movingai("arena.map", diagonal=True)
+    save_movingai(grid, "arena.map")
+"""
+# Libraries ###################################################################
+import mmap
+import os
+import struct
+
+from .grid import WALL, _WALLS, Grid
+
+# Variables ###################################################################
+_MAGIC = b"PFMAP1\n"
+_HEADER = struct.Struct("<IIB")
+HEADER_SIZE = len(_MAGIC) + _HEADER.size
+
+# Moving AI characters of passable cells, every other one is a wall
+_MOVINGAI_FREE = b".GS"
+_MOVINGAI_WALLS = bytes(0 if value in _MOVINGAI_FREE else 1 for value in range(256))
+_MOVINGAI_CHARS = bytes(ord("@") if value & WALL else ord(".") for value in range(256))
+
+# Binary Map Files ############################################################
+def save_map(grid, path):
+    # Written next to the old file and moved over it, since a grid mapped
+    # from the old file would crash reading pages of a truncated one
+    grid.update_masks()
+    temporary = "%s.tmp" % path
+    with open(temporary, "wb") as file:
+        file.write(_MAGIC)
+        file.write(_HEADER.pack(grid.rows, grid.cols, grid.diagonal))
+        file.write(bytes(grid.cells).translate(_WALLS))
+        file.write(grid.costs)
+        file.write(grid.masks)
+    os.replace(temporary, path)
+
+def load_map(path, mapped=False):
+    with open(path, "rb") as file:
+        data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_COPY if mapped else mmap.ACCESS_READ)
+    
+    if len(data) < HEADER_SIZE or data[:len(_MAGIC)] != _MAGIC:
+        data.close()
+        raise ValueError("%s is not a map file" % path)
+    rows, cols, diagonal = _HEADER.unpack_from(data, len(_MAGIC))
+    size = rows * cols
+    if len(data) != HEADER_SIZE + 3 * size:
+        data.close()
+        raise ValueError("Map file %s is truncated or too long for %dx%d cells" % (path, rows, cols))
+    
+    # The views keep the mapping open as long as the grid uses them
+    view = memoryview(data)
+    walls = view[HEADER_SIZE:HEADER_SIZE + size]
+    costs = view[HEADER_SIZE + size:HEADER_SIZE + 2 * size]
+    masks = view[HEADER_SIZE + 2 * size:HEADER_SIZE + 3 * size]
+    if mapped:
+        return Grid.from_buffers(rows, cols, walls, costs, masks, bool(diagonal))
+    
+    grid = Grid(rows, cols, bool(diagonal))
+    grid.cells[:] = walls
+    grid.costs[:] = costs
+    grid.masks = bytearray(masks)
+    for section in (walls, costs, masks, view):
+        section.release()
+    data.close()
+    return grid
+
+# Moving AI Maps ##############################################################
+def load_movingai(path, diagonal):
+    with open(path, "rb") as file:
+        header = {}
+        while True:
+            line = file.readline()
+            if not line:
+                raise ValueError("%s has no map section" % path)
+            line = line.strip()
+            if line == b"map":
+                break
+            if line:
+                key, _, value = line.partition(b" ")
+                header[key.lower()] = value.strip()
+        try:
+            rows = int(header[b"height"])
+            cols = int(header[b"width"])
+        except (KeyError, ValueError):
+            raise ValueError("%s has no valid height and width" % path)
+        lines = file.read().split()
+    
+    if len(lines) != rows or any(len(line) != cols for line in lines):
+        raise ValueError("Map %s does not have %d rows of %d cells" % (path, rows, cols))
+    
+    grid = Grid(rows, cols, diagonal)
+    grid.set_cells(b"".join(lines).translate(_MOVINGAI_WALLS))
+    return grid
+
+def save_movingai(grid, path):
+    # Only walls are written, the format has no movement costs
+    cols = grid.cols
+    chars = bytes(grid.cells).translate(_MOVINGAI_CHARS)
+    with open(path, "wb") as file:
+        file.write(b"type octile\nheight %d\nwidth %d\nmap\n" % (grid.rows, cols))
+        for start in range(0, grid.size, cols):
+            file.write(chars[start:start + cols])
+            file.write(b"\n")
@@ -0,0 +1,505 @@
+# -*- coding: utf-8 -*-
+"""
+Maze and terrain generators
+
+Description:
+    Headless generators which write a whole map into the wall and cost arrays
+    of a Grid at once, for the visualizer and for benchmark maps. Every
+    generator takes a seed, and the same seed gives the same map again for
+    the same grid size. NumPy draws other random numbers than the random
+    module, so with use_numpy=False the map for a seed is a different one.
+
+    The mazes are perfect mazes on a lattice of rooms: cells with an odd row
+    and an odd column are rooms, a cell between two rooms is a wall or the
+    passage joining them and all other cells are walls. There is exactly one
+    path between any two rooms.
+        recursive_division - splits an open area with a wall with one gap,
+                             then both halves and so on, which leaves long
+                             straight walls
+        prim               - grows the maze from one room, joining a random
+                             room next to it at every step, which leaves many
+                             short dead ends
+        kruskal            - joins rooms through walls in random order,
+                             skipping walls between rooms already connected
+    The other generators are not mazes:
+        caves              - random walls smoothed into caves by a cellular
+                             automaton, which may leave closed off pockets
+        terrain            - fractal value noise turned into movement costs,
+                             and into walls above wall_level if it is given
+
+    With NumPy, recursive division splits all areas of one level of the
+    division at once, and Kruskal's algorithm runs as Boruvka's algorithm
+    over random wall weights: it finds the same spanning tree Kruskal's
+    algorithm would find taking the walls by weight, but a whole round of
+    merges at once. Prim's algorithm runs as a shortest path search over
+    random waiting times, which gives the same mazes as picking random
+    frontier rooms one at a time, see _prim_numpy(). Caves and terrain are
+    plain array operations.
+
+Usage:
+    grid = Grid(2001, 2001)
+    generate_maze(grid, "kruskal", seed=42)
+    cellular_caves(grid, seed=7, fill=0.45)
+    noise_terrain(grid, seed=7, max_cost=9, wall_level=0.8)
+"""
+# Libraries ###################################################################
+from array import array
+import random
+
+from .grid import _numpy
+
+# Variables ###################################################################
+# Width of the time windows of Prim's algorithm with NumPy, in mean waiting
+# times. Wider windows take fewer rounds but relax rooms more often.
+PRIM_WINDOW = 2.0
+
+# Helpers #####################################################################
+def _rooms(grid):
+    # Rooms per column and per row of the lattice
+    if grid.rows < 3 or grid.cols < 3:
+        raise ValueError("A maze needs a grid of at least 3x3 cells, got %dx%d" % (grid.rows, grid.cols))
+    return (grid.rows - 1) // 2, (grid.cols - 1) // 2
+
+def _room_walls(grid, rooms_rows, rooms_cols):
+    # All cells walls except the rooms, as a flat bytearray
+    cols = grid.cols
+    walls = bytearray(b"\x01") * grid.size
+    for room_row in range(rooms_rows):
+        start = (2 * room_row + 1) * cols + 1
+        walls[start:start + 2 * rooms_cols:2] = bytes(rooms_cols)
+    return walls
+
+def _passage(cols, room_cols, first, second):
+    # Cell between two neighboring rooms
+    first_row, first_col = divmod(first, room_cols)
+    second_row, second_col = divmod(second, room_cols)
+    return (first_row + second_row + 1) * cols + first_col + second_col + 1
+
+# Recursive Division ##########################################################
+# Areas are kept as (top, left, height, width) in rooms. A wall goes between
+# two rows (or columns) of rooms of an area, across the whole area, with a
+# gap at one of its rooms, and the areas on both sides are split in turn
+# until they are one room wide. Areas are split across their longer side.
+def recursive_division(grid, seed=None, use_numpy=True):
+    rooms_rows, rooms_cols = _rooms(grid)
+    np = _numpy() if use_numpy else None
+    if np is not None:
+        walls = _recursive_division_numpy(grid, rooms_rows, rooms_cols, np.random.default_rng(seed))
+    else:
+        walls = _recursive_division_python(grid, rooms_rows, rooms_cols, random.Random(seed))
+    grid.set_cells(walls)
+
+def _recursive_division_python(grid, rooms_rows, rooms_cols, rng):
+    cols = grid.cols
+    walls = bytearray(b"\x01") * grid.size
+    for row in range(1, 2 * rooms_rows):
+        walls[row * cols + 1:row * cols + 2 * rooms_cols] = bytes(2 * rooms_cols - 1)
+    
+    areas = [(0, 0, rooms_rows, rooms_cols)]
+    while areas:
+        top, left, height, width = areas.pop()
+        if height < 2 or width < 2:
+            continue
+        
+        horizontal = height > width or (height == width and rng.random() < 0.5)
+        if horizontal:
+            split = rng.randrange(height - 1)
+            start = 2 * (top + split + 1) * cols + 2 * left + 1
+            end = start + 2 * width - 1
+            walls[start:end] = b"\x01" * (end - start)
+            walls[start + 2 * rng.randrange(width)] = 0
+            areas.append((top, left, split + 1, width))
+            areas.append((top + split + 1, left, height - split - 1, width))
+        else:
+            split = rng.randrange(width - 1)
+            start = (2 * top + 1) * cols + 2 * (left + split + 1)
+            end = start + (2 * height - 1) * cols
+            walls[start:end:cols] = b"\x01" * (2 * height - 1)
+            walls[start + 2 * rng.randrange(height) * cols] = 0
+            areas.append((top, left, height, split + 1))
+            areas.append((top, left + split + 1, height, width - split - 1))
+    return walls
+
+def _recursive_division_numpy(grid, rooms_rows, rooms_cols, rng):
+    np = _numpy()
+    cols = grid.cols
+    walls = np.ones((grid.rows, cols), dtype=np.uint8)
+    walls[1:2 * rooms_rows, 1:2 * rooms_cols] = 0
+    walls = walls.reshape(-1)
+    
+    top = np.zeros(1, dtype=np.int64)
+    left = np.zeros(1, dtype=np.int64)
+    height = np.array([rooms_rows], dtype=np.int64)
+    width = np.array([rooms_cols], dtype=np.int64)
+    while len(top):
+        divisible = (height > 1) & (width > 1)
+        top, left, height, width = top[divisible], left[divisible], height[divisible], width[divisible]
+        if not len(top):
+            break
+        
+        horizontal = (height > width) | ((height == width) & (rng.random(len(top)) < 0.5))
+        across = np.where(horizontal, height, width)
+        along = np.where(horizontal, width, height)
+        split = rng.integers(0, across - 1)
+        gap = rng.integers(0, along)
+        
+        # First cell of every wall, the step between its cells and its length
+        start = np.where(horizontal, 2 * (top + split + 1) * cols + 2 * left + 1,
+                         (2 * top + 1) * cols + 2 * (left + split + 1))
+        step = np.where(horizontal, 1, cols)
+        length = 2 * along - 1
+        offsets = np.arange(length.sum()) - np.repeat(np.cumsum(length) - length, length)
+        walls[np.repeat(start, length) + np.repeat(step, length) * offsets] = 1
+        walls[start + 2 * gap * step] = 0
+        
+        # The area before the wall keeps top and left, the one after it
+        # starts behind the wall
+        before = split + 1
+        top = np.concatenate((top, top + np.where(horizontal, before, 0)))
+        left = np.concatenate((left, left + np.where(horizontal, 0, before)))
+        height = np.concatenate((np.where(horizontal, before, height), np.where(horizontal, height - before, height)))
+        width = np.concatenate((np.where(horizontal, width, before), np.where(horizontal, width, width - before)))
+    return walls
+
+# Randomized Prim's Algorithm #################################################
+# The frontier holds the rooms next to the maze which are not part of it yet.
+# A random one of them is joined to a random neighbor inside the maze and its
+# own neighbors outside the maze join the frontier.
+def prim_maze(grid, seed=None, use_numpy=True):
+    rooms_rows, rooms_cols = _rooms(grid)
+    np = _numpy() if use_numpy else None
+    if np is not None:
+        walls = _prim_numpy(grid, rooms_rows, rooms_cols, np.random.default_rng(seed))
+    else:
+        walls = _prim_python(grid, rooms_rows, rooms_cols, random.Random(seed))
+    grid.set_cells(walls)
+
+def _prim_python(grid, rooms_rows, rooms_cols, rng):
+    cols = grid.cols
+    walls = _room_walls(grid, rooms_rows, rooms_cols)
+    
+    # Rooms are numbered on a lattice with a border of blocked rooms around
+    # it, so that every room has four neighbors to look at
+    width = rooms_cols + 2
+    # 0 - outside the maze, 1 - in the frontier, 2 - in the maze, 3 - blocked
+    state = bytearray(b"\x03") * ((rooms_rows + 2) * width)
+    # Cell index of every room
+    room_cells = array("i", [0]) * len(state)
+    for room_row in range(rooms_rows):
+        first = (room_row + 1) * width + 1
+        state[first:first + rooms_cols] = bytes(rooms_cols)
+        row_cells = range((2 * room_row + 1) * cols + 1, (2 * room_row + 2) * cols, 2)
+        room_cells[first:first + rooms_cols] = array("i", row_cells[:rooms_cols])
+    
+    first_room = (rng.randrange(rooms_rows) + 1) * width + rng.randrange(rooms_cols) + 1
+    frontier = [first_room]
+    state[first_room] = 1
+    random_number = rng.random
+    while frontier:
+        # Pick a random frontier room, moving the last one into its place
+        pick = int(random_number() * len(frontier))
+        room = frontier[pick]
+        frontier[pick] = frontier[-1]
+        frontier.pop()
+        
+        inside = []
+        for neighbor in (room - width, room + width, room - 1, room + 1):
+            neighbor_state = state[neighbor]
+            if neighbor_state == 2:
+                inside.append(neighbor)
+            elif not neighbor_state:
+                state[neighbor] = 1
+                frontier.append(neighbor)
+        state[room] = 2
+        if inside:
+            # The passage is halfway between the two rooms
+            neighbor = inside[int(random_number() * len(inside))]
+            walls[(room_cells[room] + room_cells[neighbor]) >> 1] = 0
+    return walls
+
+def _prim_numpy(grid, rooms_rows, rooms_cols, rng):
+    # Picking a random frontier room is the same as giving every room an
+    # exponentially distributed waiting time once it joins the frontier and
+    # taking the rooms in the order their time runs out: the waiting times
+    # have no memory, so the next one to run out is a random frontier room.
+    # A room joins the frontier when its first neighbor joins the maze, so
+    # the time it joins the maze is its waiting time plus the smallest time
+    # of its neighbors, a shortest path distance with the waiting times as
+    # room costs. They are found one window of PRIM_WINDOW time at a time,
+    # relaxing all rooms of the window at once until none of them improves
+    # (delta-stepping). Every room is then joined to a random neighbor which
+    # joined the maze before it.
+    np = _numpy()
+    cols = grid.cols
+    walls = np.frombuffer(_room_walls(grid, rooms_rows, rooms_cols), dtype=np.uint8).copy()
+    
+    # Rooms on a lattice with a border of blocked rooms, as in Python
+    width = rooms_cols + 2
+    count = (rooms_rows + 2) * width
+    lattice = np.arange(count).reshape(rooms_rows + 2, width)[1:-1, 1:-1].ravel()
+    waiting = np.full(count, np.inf)
+    waiting[lattice] = rng.exponential(size=len(lattice))
+    times = np.full(count, np.inf)
+    first = lattice[rng.integers(len(lattice))]
+    times[first] = 0
+    offsets = np.array([-width, width, -1, 1])[:, None]
+    
+    # Rooms reached but not taken yet, and a stamp for picking one of each
+    queue = np.array([first])
+    queued = np.zeros(count, dtype=bool)
+    stamp = np.zeros(count, dtype=np.int64)
+    while len(queue):
+        end = times[queue].min() + PRIM_WINDOW
+        now = times[queue] < end
+        active = queue[now]
+        queued[active] = False
+        later = [queue[~now]]
+        while len(active):
+            neighbors = (active + offsets).ravel()
+            candidates = np.tile(times[active], 4) + waiting[neighbors]
+            better = candidates < times[neighbors]
+            neighbors = neighbors[better]
+            np.minimum.at(times, neighbors, candidates[better])
+            order = np.arange(len(neighbors))
+            stamp[neighbors] = order
+            neighbors = neighbors[stamp[neighbors] == order]
+            inside = times[neighbors] < end
+            active = neighbors[inside]
+            outside = neighbors[~inside]
+            outside = outside[~queued[outside]]
+            queued[outside] = True
+            later.append(outside)
+        queue = np.concatenate(later)
+    
+    # A random neighbor which joined the maze earlier, none for the first room
+    earlier = times[lattice + offsets] < times[lattice]
+    keys = np.where(earlier, rng.random(earlier.shape), -1)
+    direction = keys.argmax(axis=0)
+    joined = earlier.any(axis=0)
+    room_rows, room_cols = np.divmod(np.arange(len(lattice))[joined], rooms_cols)
+    cell_offsets = np.array([-cols, cols, -1, 1])
+    walls[(2 * room_rows + 1) * cols + 2 * room_cols + 1 + cell_offsets[direction[joined]]] = 0
+    return walls
+
+# Kruskal's Algorithm #########################################################
+# Walls between rooms are taken in random order and removed when the rooms on
+# both sides are not connected yet, tracked with union-find.
+def kruskal_maze(grid, seed=None, use_numpy=True):
+    rooms_rows, rooms_cols = _rooms(grid)
+    np = _numpy() if use_numpy else None
+    if np is not None:
+        walls = _kruskal_numpy(grid, rooms_rows, rooms_cols, np.random.default_rng(seed))
+    else:
+        walls = _kruskal_python(grid, rooms_rows, rooms_cols, random.Random(seed))
+    grid.set_cells(walls)
+
+def _kruskal_python(grid, rooms_rows, rooms_cols, rng):
+    cols = grid.cols
+    walls = _room_walls(grid, rooms_rows, rooms_cols)
+    count = rooms_rows * rooms_cols
+    edges = [(room, room + 1) for room in range(count) if room % rooms_cols < rooms_cols - 1]
+    edges += [(room, room + rooms_cols) for room in range(count - rooms_cols)]
+    rng.shuffle(edges)
+    
+    parent = array("i", range(count))
+    
+    def find(room):
+        while parent[room] != room:
+            parent[room] = parent[parent[room]]
+            room = parent[room]
+        return room
+    
+    joined = 0
+    for first, second in edges:
+        first_root = find(first)
+        second_root = find(second)
+        if first_root != second_root:
+            parent[first_root] = second_root
+            walls[_passage(cols, rooms_cols, first, second)] = 0
+            joined += 1
+            if joined == count - 1:
+                break
+    return walls
+
+def _kruskal_numpy(grid, rooms_rows, rooms_cols, rng):
+    # Boruvka's algorithm: every round each component takes its lightest
+    # edge to another component. The weights are a random permutation of
+    # the edges, so every weight belongs to exactly one edge. Components are
+    # numbered 0 to count - 1 again after every round, so the arrays indexed
+    # by component shrink as they merge.
+    np = _numpy()
+    cols = grid.cols
+    walls = np.frombuffer(_room_walls(grid, rooms_rows, rooms_cols), dtype=np.uint8).copy()
+    count = rooms_rows * rooms_cols
+    rooms = np.arange(count, dtype=np.int32).reshape(rooms_rows, rooms_cols)
+    edge_first = np.concatenate((rooms[:, :-1].ravel(), rooms[:-1, :].ravel()))
+    edge_second = np.concatenate((rooms[:, 1:].ravel(), rooms[1:, :].ravel()))
+    edge_count = len(edge_first)
+    weights = rng.permutation(edge_count).astype(np.int32)
+    edge_of_weight = np.empty(edge_count, dtype=np.int32)
+    edge_of_weight[weights] = np.arange(edge_count, dtype=np.int32)
+    in_tree = np.zeros(edge_count, dtype=bool)
+    
+    # Components at both ends of the edges still joining two components
+    first = edge_first
+    second = edge_second
+    while count > 1:
+        between = first != second
+        weights = weights[between]
+        first = first[between]
+        second = second[between]
+        
+        # Lightest edge of every component and the component across it
+        lightest = np.full(count, edge_count, dtype=np.int32)
+        np.minimum.at(lightest, first, weights)
+        np.minimum.at(lightest, second, weights)
+        in_tree[edge_of_weight[lightest]] = True
+        across = np.empty(count, dtype=np.int32)
+        light = weights == lightest[first]
+        across[first[light]] = second[light]
+        light = weights == lightest[second]
+        across[second[light]] = first[light]
+        
+        # Every component points to the one across its lightest edge. Two
+        # components picking the same edge point to each other, the smaller
+        # one becomes the root of the merged component.
+        components = np.arange(count, dtype=np.int32)
+        mutual = (across[across] == components) & (components < across)
+        across[mutual] = components[mutual]
+        while True:
+            jumped = across[across]
+            if np.array_equal(jumped, across):
+                break
+            across = jumped
+        
+        roots = across == components
+        number = np.cumsum(roots, dtype=np.int32) - 1
+        count = int(number[-1]) + 1
+        label = number[across]
+        first = label[first]
+        second = label[second]
+    
+    first = edge_first[in_tree].astype(np.int64)
+    second = edge_second[in_tree].astype(np.int64)
+    walls[(first // rooms_cols + second // rooms_cols + 1) * cols + first % rooms_cols + second % rooms_cols + 1] = 0
+    return walls
+
+# Cellular Automaton Caves ####################################################
+# fill is the share of random walls to start from. In every iteration a cell
+# becomes a wall if at least 5 of the 9 cells around it and including it are
+# walls, counting cells outside the grid as walls. The border is made walls.
+def cellular_caves(grid, seed=None, fill=0.45, iterations=4, use_numpy=True):
+    if not 0 <= fill <= 1:
+        raise ValueError("Wall fill must be between 0 and 1, got %r" % fill)
+    rows = grid.rows
+    cols = grid.cols
+    
+    np = _numpy() if use_numpy else None
+    if np is not None:
+        walls = np.random.default_rng(seed).random((rows, cols)) < fill
+        for _ in range(iterations):
+            padded = np.pad(walls, 1, constant_values=True).astype(np.uint8)
+            count = sum(padded[row:row + rows, col:col + cols] for row in range(3) for col in range(3))
+            walls = count >= 5
+        walls[[0, -1], :] = True
+        walls[:, [0, -1]] = True
+        grid.set_cells(walls.astype(np.uint8).reshape(-1))
+        return
+    
+    rng = random.Random(seed)
+    walls = [[rng.random() < fill for _ in range(cols)] for _ in range(rows)]
+    for _ in range(iterations):
+        padded = [[True] * (cols + 2)] + [[True] + row + [True] for row in walls] + [[True] * (cols + 2)]
+        walls = [[sum(padded[row + near_row][col + near_col] for near_row in range(3) for near_col in range(3)) >= 5
+                  for col in range(cols)] for row in range(rows)]
+    walls[0] = walls[-1] = [True] * cols
+    for row in walls:
+        row[0] = row[-1] = True
+    grid.set_cells(bytes(wall for row in walls for wall in row))
+
+# Noise Terrain ###############################################################
+# Value noise: random values on a lattice every scale cells, interpolated in
+# between, plus octaves of it with half the spacing and half the weight each
+# time. The noise (0 - 1) sets the cost of every cell from 1 to max_cost, and
+# cells where it is at least wall_level become walls.
+def noise_terrain(grid, seed=None, scale=32, octaves=4, max_cost=9, wall_level=None, use_numpy=True):
+    if not 1 <= max_cost <= 255:
+        raise ValueError("Maximum cost must be between 1 and 255, got %r" % max_cost)
+    if scale < 1 or octaves < 1:
+        raise ValueError("Noise scale and octaves must be at least 1")
+    rows = grid.rows
+    cols = grid.cols
+    
+    np = _numpy() if use_numpy else None
+    if np is not None:
+        rng = np.random.default_rng(seed)
+        noise = np.zeros((rows, cols))
+        total = 0
+        for octave in range(octaves):
+            spacing = max(scale >> octave, 1)
+            lattice = rng.random((rows // spacing + 2, cols // spacing + 2))
+            row, row_weight = _lattice_numpy(rows, spacing)
+            col, col_weight = _lattice_numpy(cols, spacing)
+            # Interpolated along the rows of the lattice first, then across them
+            lattice = lattice[:, col] * (1 - col_weight) + lattice[:, col + 1] * col_weight
+            row_weight = row_weight[:, None]
+            weight = 0.5 ** octave
+            noise += (lattice[row] * (1 - row_weight) + lattice[row + 1] * row_weight) * weight
+            total += weight
+        noise /= total
+        
+        costs = np.minimum(1 + (noise * max_cost).astype(np.int64), max_cost).astype(np.uint8)
+        walls = noise >= wall_level if wall_level is not None else np.zeros((rows, cols), dtype=bool)
+        grid.set_cells(walls.astype(np.uint8).reshape(-1), costs.reshape(-1))
+        return
+    
+    rng = random.Random(seed)
+    noise = [[0.0] * cols for _ in range(rows)]
+    total = 0
+    for octave in range(octaves):
+        spacing = max(scale >> octave, 1)
+        lattice = [[rng.random() for _ in range(cols // spacing + 2)] for _ in range(rows // spacing + 2)]
+        weight = 0.5 ** octave
+        row_points = [_lattice_point(row, spacing) for row in range(rows)]
+        col_points = [_lattice_point(col, spacing) for col in range(cols)]
+        for row, (lattice_row, row_weight) in enumerate(row_points):
+            upper_values = lattice[lattice_row]
+            lower_values = lattice[lattice_row + 1]
+            noise_row = noise[row]
+            for col, (lattice_col, col_weight) in enumerate(col_points):
+                upper = upper_values[lattice_col] * (1 - col_weight) + upper_values[lattice_col + 1] * col_weight
+                lower = lower_values[lattice_col] * (1 - col_weight) + lower_values[lattice_col + 1] * col_weight
+                noise_row[col] += (upper * (1 - row_weight) + lower * row_weight) * weight
+        total += weight
+    
+    values = [value / total for row in noise for value in row]
+    costs = bytes(min(1 + int(value * max_cost), max_cost) for value in values)
+    walls = bytes(wall_level is not None and value >= wall_level for value in values)
+    grid.set_cells(walls, costs)
+
+def _lattice_point(position, spacing):
+    # Lattice point before position and the smoothed weight of the next one
+    point, offset = divmod(position, spacing)
+    fraction = offset / spacing
+    return point, fraction * fraction * (3 - 2 * fraction)
+
+def _lattice_numpy(length, spacing):
+    np = _numpy()
+    positions = np.arange(length)
+    fraction = (positions % spacing) / spacing
+    return positions // spacing, fraction * fraction * (3 - 2 * fraction)
+
+# Generator Registry ##########################################################
+GENERATORS = {
+    "recursive_division": recursive_division,
+    "prim": prim_maze,
+    "kruskal": kruskal_maze,
+    "caves": cellular_caves,
+    "terrain": noise_terrain,
+}
+
+# Extra keyword options are passed on to the generator, e.g. fill for caves
+def generate_maze(grid, generator="recursive_division", seed=None, **options):
+    if generator not in GENERATORS:
+        raise ValueError("Unknown maze generator: %s" % generator)
+    GENERATORS[generator](grid, seed, **options)
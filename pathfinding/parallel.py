@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+"""
+Parallel batch queries
+
+Description:
+    Spreads batch queries over a pool of worker processes so a server can use
+    all of its cores. The grid is not pickled to the workers: its neighbor
+    masks and movement costs are copied into one multiprocessing shared memory
+    block, 2 bytes per cell, which every worker maps into a Grid of its own.
+    Only the start/goal pairs go to the workers and only the results come
+    back. Each worker keeps a Workspace, so its score buffers are reused
+    between chunks and batches.
+
+    The pool and the shared block live as long as the ParallelPathfinder. It
+    listens to changes of the grid and copies the masks and costs into the
+    shared block again before the next batch, so the workers always see the
+    current walls without being restarted.
+
+Usage:
+    with ParallelPathfinder(grid, workers=16) as pathfinder:
+        results = pathfinder.find_paths(pairs, algorithm="a_star")
+    results = find_paths_parallel(grid, pairs, workers=4, chunk_size=64)
+"""
+# Libraries ###################################################################
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from multiprocessing import shared_memory
+import os
+
+from .batch import BATCH_ALGORITHMS, Workspace
+from .grid import Grid, as_grid
+from .search import _check_positions
+
+# Variables ###################################################################
+# Chunks per worker when no chunk size is given: small enough to balance the
+# load, large enough that sending a chunk costs little next to searching it
+CHUNKS_PER_WORKER = 4
+
+# Workspace of the worker process, set up by _init_worker
+_worker = None
+
+# Worker Process ##############################################################
+def _init_worker(name, rows, cols, diagonal):
+    # The parent owns the block and unlinks it, the worker only maps it
+    global _worker
+    memory = shared_memory.SharedMemory(name=name)
+    
+    size = rows * cols
+    grid = Grid(rows, cols, diagonal)
+    grid.masks = memory.buf[:size]
+    grid.costs = memory.buf[size:2 * size]
+    _worker = (memory, Workspace(grid))
+
+def _run_chunk(chunk, algorithm, heuristic, min_cost):
+    return _worker[1]._run(chunk, algorithm, heuristic, min_cost)
+
+# Parallel Pathfinder Class ###################################################
+class ParallelPathfinder:
+    def __init__(self, grid, workers=None, chunk_size=None):
+        self.grid = as_grid(grid)
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        if self.workers < 1:
+            raise ValueError("Worker count must be at least 1, got %r" % workers)
+        if chunk_size is not None and chunk_size < 1:
+            raise ValueError("Chunk size must be at least 1, got %r" % chunk_size)
+        
+        grid = self.grid
+        self.memory = shared_memory.SharedMemory(create=True, size=max(2 * grid.size, 1))
+        self.changed = True
+        self._publish()
+        grid.add_listener(self._grid_changed)
+        self.pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                        initargs=(self.memory.name, grid.rows, grid.cols, grid.diagonal))
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+    
+    def close(self):
+        if self.pool is None:
+            return
+        self.grid.remove_listener(self._grid_changed)
+        self.pool.shutdown()
+        self.pool = None
+        self.memory.close()
+        self.memory.unlink()
+    
+    def _grid_changed(self, index):
+        self.changed = True
+    
+    def _publish(self):
+        # Copies the current masks and costs into the shared block
+        grid = self.grid
+        grid.update_masks()
+        size = grid.size
+        self.memory.buf[:size] = grid.masks
+        self.memory.buf[size:2 * size] = grid.costs
+        self.min_cost = grid.min_cost
+        self.changed = False
+    
+    def find_paths(self, pairs, algorithm="a_star", heuristic=None):
+        # Results come back in the order of pairs. heuristic has to be a name
+        # or a module level function so that it can be sent to the workers.
+        if algorithm not in BATCH_ALGORITHMS:
+            raise ValueError("Unknown batch algorithm: %s" % algorithm)
+        if self.pool is None:
+            raise ValueError("The pathfinder is closed")
+        if self.changed or self.grid.dirty or self.grid.masks is None:
+            self._publish()
+        
+        # Checked here, a worker would answer for the cell the index wraps to
+        pairs = list(pairs)
+        for start, end in pairs:
+            _check_positions(self.grid, start, end)
+        chunk_size = self.chunk_size or max(1, -(-len(pairs) // (self.workers * CHUNKS_PER_WORKER)))
+        chunks = [pairs[i:i + chunk_size] for i in range(0, len(pairs), chunk_size)]
+        
+        results = []
+        for chunk_results in self.pool.map(_run_chunk, chunks, repeat(algorithm), repeat(heuristic), repeat(self.min_cost)):
+            results.extend(chunk_results)
+        return results
+
+def find_paths_parallel(grid, pairs, algorithm="a_star", heuristic=None, workers=None, chunk_size=None):
+    with ParallelPathfinder(grid, workers, chunk_size) as pathfinder:
+        return pathfinder.find_paths(pairs, algorithm, heuristic)
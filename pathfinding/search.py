@@ -0,0 +1,699 @@
+# -*- coding: utf-8 -*-
+"""
+Headless search engine
+
+Description:
+    The path finding algorithms of the visualizer without any display, event
+    handling or sleeping, so they can be imported and queried by a server.
+    Every search takes a compact Grid (or a plain list of rows in which a
+    truthy value marks a wall) together with start and end (row, col)
+    positions and returns a SearchResult holding the path from start to end
+    and some statistics. Dijkstra's algorithm and A* find the cheapest path
+    over the movement costs of the grid, the other searches the path with the
+    fewest steps. The visited, in queue and path flags of the grid are
+    left set by the search for the caller to inspect.
+
+Observers:
+    Every search accepts an optional observer callable which is notified as
+    the search progresses:
+        observer("in_queue", (row, col)) - a cell was added to the frontier
+        observer("visited", (row, col))  - a cell was expanded
+        observer("step", None)           - one iteration of the search is done
+
+    The searches are generators underneath, which only yield these events
+    when they are observed. search_steps() hands out the generator itself, so
+    the caller decides how far the search runs at a time. This is how the
+    pygame visualizer spreads a search over its frames:
+        steps = search_steps(grid, (0, 0), (9, 9), algorithm="a_star")
+        for event, position in steps:
+            ...
+    The SearchResult is the return value of the generator (the value of
+    StopIteration, or of "yield from").
+"""
+# Libraries ###################################################################
+from array import array
+from collections import deque, namedtuple
+from heapq import heappush, heappop
+import time
+
+from .grid import WALL, VISITED, IN_QUEUE, PATH, DIAGONAL_COST, _as_bytes, as_grid
+from .heuristics import get_heuristic
+
+# Search Result ###############################################################
+# found - True if a path exists
+# path  - list of (row, col) positions from start to end, empty if not found
+# stats - dict of counters about the search, always "expanded" and "elapsed"
+#         plus algorithm specific ones such as the path "cost" or the heap
+#         "pushes" and "pops"
+SearchResult = namedtuple("SearchResult", ["found", "path", "stats"])
+
+def _observed(steps, observer):
+    # Runs a search generator to its end, passing its events to observer.
+    # Unobserved searches yield nothing and end on the first next().
+    while True:
+        try:
+            event, position = next(steps)
+        except StopIteration as stop:
+            return stop.value
+        observer(event, position)
+
+def _result(grid, path, expanded, started, **counters):
+    cells = grid.cells
+    for index in path:
+        cells[index] |= PATH
+    
+    stats = {"expanded": expanded, "elapsed": time.perf_counter() - started}
+    stats.update(counters)
+    return SearchResult(bool(path), [grid.position(index) for index in path], stats)
+
+def _previous_nodes(grid, start):
+    # One predecessor index per cell, -1 until the cell is reached. The start
+    # points to itself so that it counts as reached.
+    previous = array("i", [-1]) * grid.size
+    previous[start] = start
+    return previous
+
+def _check_positions(grid, *positions):
+    # An index outside the grid would wrap around to another cell
+    for position in positions:
+        if not grid.in_bounds(position):
+            raise ValueError("Position %r is outside the %dx%d grid" % (tuple(position), grid.rows, grid.cols))
+
+def _prepare(grid, start, end):
+    # Every search runs against a compact Grid with the previous search cleared
+    grid = as_grid(grid)
+    _check_positions(grid, start, end)
+    grid.clear_search()
+    return grid, grid.index(start), grid.index(end)
+
+# Dijkstra's Algorithm ########################################################
+# The queue uses lazy deletion: a node is only pushed when its cost improves
+# and entries which were superseded by a cheaper push are skipped when popped.
+def dijkstra(grid, start, end, observer=None):
+    return _observed(_dijkstra(grid, start, end, observer is not None), observer)
+
+def _dijkstra(grid, start, end, observe=False):
+    started = time.perf_counter()
+    grid, start, end = _prepare(grid, start, end)
+    cells = grid.cells
+    expanded = pushes = pops = stale = 0
+    
+    cost = [float("inf")] * grid.size
+    previous = _previous_nodes(grid, start)
+    cost[start] = 0
+    
+    queue = [(0, start)]
+    pushes += 1
+    
+    while queue:
+        current_cost, current = heappop(queue)
+        pops += 1
+        
+        # Skip entries of nodes which were already reached more cheaply
+        if current_cost > cost[current] or cells[current] & VISITED:
+            stale += 1
+            continue
+        
+        if current == end:
+            path = construct_path(previous, end, start)
+            return _result(grid, path, expanded, started, cost=current_cost, pushes=pushes, pops=pops, stale=stale)
+        
+        cells[current] |= VISITED
+        expanded += 1
+        if observe:
+            yield "visited", grid.position(current)
+        
+        for neighbor, step_cost in grid.neighbor_costs(current):
+            if not cells[neighbor] & VISITED:
+                # cost = cost till now + cost to reach that neighbor
+                neighbor_cost = current_cost + step_cost
+                if neighbor_cost < cost[neighbor]:
+                    cost[neighbor] = neighbor_cost
+                    previous[neighbor] = current
+                    heappush(queue, (neighbor_cost, neighbor))
+                    pushes += 1
+                    cells[neighbor] |= IN_QUEUE
+                    if observe:
+                        yield "in_queue", grid.position(neighbor)
+        
+        if observe:
+            yield "step", None
+    return _result(grid, [], expanded, started, pushes=pushes, pops=pops, stale=stale)
+
+# A* Search Algorithm #########################################################
+def construct_path(previous, current, start):
+    # Constructing a list which shows path from Start to End by following
+    # the predecessor of every node back to the start
+    path = [current]
+    
+    while current != start:
+        current = previous[current]
+        path.append(current)
+    
+    path.reverse()
+    return path
+
+# The open set is the heap plus the IN_QUEUE flag of the grid and the closed
+# set is the VISITED flag, so membership is a single byte test. A node whose
+# g score improves is pushed again and the outdated entry is skipped when it
+# is popped. Ties on f are broken by h and then by the cell index, so the
+# result does not depend on comparing cells. f is rounded so that paths of
+# equal cost with diagonal steps still tie despite floating point error.
+#
+# The heuristic is one of the names in heuristics.HEURISTICS or a function
+# (p1, p2, min_cost); by default the one matching the grid's movement model.
+def a_star(grid, start, end, observer=None, heuristic=None):
+    return _observed(_a_star(grid, start, end, observer is not None, heuristic), observer)
+
+def _a_star(grid, start, end, observe=False, heuristic=None):
+    started = time.perf_counter()
+    grid, start, end = _prepare(grid, start, end)
+    heuristic_function = get_heuristic(heuristic, grid.diagonal)
+    cells = grid.cells
+    min_cost = grid.min_cost
+    end_position = grid.position(end)
+    expanded = pushes = pops = stale = 0
+    
+    g_score = [float("inf")] * grid.size
+    g_score[start] = 0
+    
+    h_score = heuristic_function(grid.position(start), end_position, min_cost)
+    
+    queue = [(h_score, h_score, start)]
+    pushes += 1
+    cells[start] |= IN_QUEUE
+    previous = _previous_nodes(grid, start)
+    
+    while queue:
+        current = heappop(queue)[2]
+        pops += 1
+        
+        # Skip outdated entries of nodes which are already closed
+        if cells[current] & VISITED:
+            stale += 1
+            continue
+        
+        cells[current] |= VISITED
+        expanded += 1
+        if observe:
+            yield "visited", grid.position(current)
+        
+        if current == end:
+            path = construct_path(previous, current, start)
+            return _result(grid, path, expanded, started, cost=g_score[current], pushes=pushes, pops=pops, stale=stale)
+        
+        current_g_score = g_score[current]
+        for neighbor, step_cost in grid.neighbor_costs(current):
+            if cells[neighbor] & VISITED:
+                continue
+            
+            # temp_g_score = current_g_score + score_to_reach_neighbor
+            temp_g_score = current_g_score + step_cost
+            
+            if temp_g_score < g_score[neighbor]:
+                g_score[neighbor] = temp_g_score
+                previous[neighbor] = current
+                h_score = heuristic_function(grid.position(neighbor), end_position, min_cost)
+                heappush(queue, (round(temp_g_score + h_score, 9), h_score, neighbor))
+                pushes += 1
+                
+                if not cells[neighbor] & IN_QUEUE:
+                    cells[neighbor] |= IN_QUEUE
+                    if observe:
+                        yield "in_queue", grid.position(neighbor)
+        
+        if observe:
+            yield "step", None
+    return _result(grid, [], expanded, started, pushes=pushes, pops=pops, stale=stale)
+
+# Bidirectional Search Algorithm ##############################################
+# Both searches are breadth-first and take turns expanding one whole layer of
+# their frontier, always the smaller one. Every edge that links the two
+# searches is a candidate meeting point and the shortest one found in the
+# layer where they first touch gives the shortest path.
+def bidirectional(grid, start, end, observer=None):
+    return _observed(_bidirectional(grid, start, end, observer is not None), observer)
+
+def _bidirectional(grid, start, end, observe=False):
+    started = time.perf_counter()
+    grid, start, end = _prepare(grid, start, end)
+    cells = grid.cells
+    expanded = 0
+    
+    if start == end:
+        return _result(grid, [start], expanded, started)
+    
+    start_queue = deque([start])
+    end_queue = deque([end])
+    
+    # Distance of every cell from either end, -1 until discovered
+    start_distance = array("i", [-1]) * grid.size
+    end_distance = array("i", [-1]) * grid.size
+    start_distance[start] = 0
+    end_distance[end] = 0
+    
+    start_prev_node = _previous_nodes(grid, start)
+    end_prev_node = _previous_nodes(grid, end)
+    
+    meeting = None
+    
+    while start_queue and end_queue and meeting is None:
+        if len(start_queue) <= len(end_queue):
+            queue, distance, prev_node, other_distance = start_queue, start_distance, start_prev_node, end_distance
+        else:
+            queue, distance, prev_node, other_distance = end_queue, end_distance, end_prev_node, start_distance
+        
+        best = float("inf")
+        for _ in range(len(queue)):
+            current = queue.popleft()
+            cells[current] |= VISITED
+            expanded += 1
+            if observe:
+                yield "visited", grid.position(current)
+            
+            neighbor_distance = distance[current] + 1
+            for neighbor in grid.neighbors(current):
+                if distance[neighbor] == -1:
+                    distance[neighbor] = neighbor_distance
+                    prev_node[neighbor] = current
+                    queue.append(neighbor)
+                    cells[neighbor] |= IN_QUEUE
+                    if observe:
+                        yield "in_queue", grid.position(neighbor)
+                
+                if other_distance[neighbor] != -1 and neighbor_distance + other_distance[neighbor] < best:
+                    best = neighbor_distance + other_distance[neighbor]
+                    meeting = (current, neighbor) if distance is start_distance else (neighbor, current)
+            
+            if observe:
+                yield "step", None
+    
+    if meeting is not None:
+        # The start half ends on one side of the meeting edge, the end half
+        # continues from the other side
+        path = construct_path(start_prev_node, meeting[0], start)
+        path.extend(reversed(construct_path(end_prev_node, meeting[1], end)))
+        return _result(grid, path, expanded, started)
+    return _result(grid, [], expanded, started)
+
+# Breadth-First Search (BFS) Algorithm ########################################
+# Cells are marked when they are added to the queue, so every cell is queued
+# at most once and keeps the predecessor that discovered it first.
+def bfs(grid, start, end, observer=None):
+    return _observed(_bfs(grid, start, end, observer is not None), observer)
+
+def _bfs(grid, start, end, observe=False):
+    started = time.perf_counter()
+    grid, start, end = _prepare(grid, start, end)
+    cells = grid.cells
+    expanded = 0
+    queue = deque([start])
+    cells[start] |= IN_QUEUE
+    prev_node = _previous_nodes(grid, start)
+    
+    while queue:
+        current = queue.popleft()
+        cells[current] |= VISITED
+        expanded += 1
+        
+        if current == end:
+            path = construct_path(prev_node, end, start)
+            return _result(grid, path, expanded, started)
+        if observe:
+            yield "visited", grid.position(current)
+        
+        for neighbor in grid.neighbors(current):
+            if not cells[neighbor] & IN_QUEUE:
+                cells[neighbor] |= IN_QUEUE
+                prev_node[neighbor] = current
+                queue.append(neighbor)
+                if observe:
+                    yield "in_queue", grid.position(neighbor)
+        
+        if observe:
+            yield "step", None
+    return _result(grid, [], expanded, started)
+
+# Depth-First Search (DFS) Algorithm ##########################################
+# The search keeps its own stack of (cell, remaining neighbors) instead of
+# recursing, so it visits cells in the same order as a recursive DFS while the
+# Python stack depth stays constant whatever the size of the grid.
+#
+# With max_depth the search does not go deeper than max_depth steps from the
+# start. A cell may then be entered again when it is reached by a shorter
+# route, as required by iterative deepening.
+def depth_first_search(grid, start, end, prev_node, observe=False, max_depth=None):
+    # Returns (found, expanded, cut_off) where cut_off tells if max_depth
+    # stopped the search from going further
+    cells = grid.cells
+    depth = None
+    if max_depth is not None:
+        depth = array("i", [max_depth + 1]) * grid.size
+        depth[start] = 0
+    
+    cells[start] |= VISITED
+    expanded = 1
+    cut_off = False
+    if observe:
+        yield "visited", grid.position(start)
+    
+    stack = [(start, iter(grid.neighbors(start)))]
+    while stack:
+        current, neighbors = stack[-1]
+        for neighbor in neighbors:
+            if depth is None:
+                if cells[neighbor] & VISITED:
+                    continue
+            else:
+                # The neighbor is one step deeper than current
+                neighbor_depth = len(stack)
+                if neighbor_depth > max_depth:
+                    cut_off = True
+                    continue
+                if neighbor_depth >= depth[neighbor]:
+                    continue
+                depth[neighbor] = neighbor_depth
+            
+            prev_node[neighbor] = current
+            if neighbor == end:
+                return True, expanded, cut_off
+            
+            cells[neighbor] |= IN_QUEUE | VISITED
+            expanded += 1
+            if observe:
+                yield "in_queue", grid.position(neighbor)
+                yield "step", None
+                yield "visited", grid.position(neighbor)
+            stack.append((neighbor, iter(grid.neighbors(neighbor))))
+            break
+        else:
+            # All neighbors are done, backtrack
+            stack.pop()
+    return False, expanded, cut_off
+
+def dfs(grid, start, end, observer=None, max_depth=None):
+    return _observed(_dfs(grid, start, end, observer is not None, max_depth), observer)
+
+def _dfs(grid, start, end, observe=False, max_depth=None):
+    started = time.perf_counter()
+    grid, start, end = _prepare(grid, start, end)
+    prev_node = _previous_nodes(grid, start)
+    
+    found, expanded, cut_off = yield from depth_first_search(grid, start, end, prev_node, observe, max_depth)
+    if found or start == end:
+        path = construct_path(prev_node, end, start)
+        return _result(grid, path, expanded, started, cut_off=cut_off)
+    return _result(grid, [], expanded, started, cut_off=cut_off)
+
+# Iterative deepening DFS (IDDFS) runs depth limited searches with a growing
+# depth limit, which finds a shortest path using only DFS memory. It stops
+# once a search finishes without being cut off by the limit.
+def iddfs(grid, start, end, observer=None, max_depth=None):
+    return _observed(_iddfs(grid, start, end, observer is not None, max_depth), observer)
+
+def _iddfs(grid, start, end, observe=False, max_depth=None):
+    started = time.perf_counter()
+    grid, start, end = _prepare(grid, start, end)
+    if max_depth is None:
+        max_depth = grid.size
+    expanded = 0
+    
+    for limit in range(max_depth + 1):
+        grid.clear_search()
+        prev_node = _previous_nodes(grid, start)
+        found, limit_expanded, cut_off = yield from depth_first_search(grid, start, end, prev_node, observe, limit)
+        expanded += limit_expanded
+        
+        if found or start == end:
+            path = construct_path(prev_node, end, start)
+            return _result(grid, path, expanded, started, iterations=limit + 1)
+        if not cut_off:
+            break
+    return _result(grid, [], expanded, started, iterations=limit + 1)
+
+# Jump Point Search (JPS) Algorithm ###########################################
+# A* over jump points for grids where every step costs the same. Instead of
+# adding every neighbor to the queue, the search jumps in a straight (or
+# diagonal) line until it reaches the end or a cell where a shorter path could
+# branch off, and only that jump point is queued. The paths have the same
+# length as those of A*, the cells between jump points are filled in at the
+# end. Diagonal jumps follow the same no corner cutting rule as the grid.
+def _sign(value):
+    return (value > 0) - (value < 0)
+
+def jump_point_search(grid, start, end, observer=None, heuristic=None):
+    return _observed(_jump_point_search(grid, start, end, observer is not None, heuristic), observer)
+
+def _jump_point_search(grid, start, end, observe=False, heuristic=None):
+    started = time.perf_counter()
+    grid, start, end = _prepare(grid, start, end)
+    heuristic_function = get_heuristic(heuristic, grid.diagonal)
+    cells = grid.cells
+    rows = grid.rows
+    cols = grid.cols
+    diagonal = grid.diagonal
+    
+    # Every step has to cost the same for jumping to be correct
+    step_cost = grid.costs[0] if grid.size else 1
+    if _as_bytes(grid.costs).count(step_cost) != grid.size:
+        raise ValueError("Jump Point Search needs a grid with uniform movement costs")
+    
+    end_row, end_col = grid.position(end)
+    end_position = (end_row, end_col)
+    
+    def walkable(row, col):
+        return 0 <= row < rows and 0 <= col < cols and not cells[row * cols + col] & WALL
+    
+    def forced(row, col, drow, dcol):
+        # A straight move has a forced neighbor when a wall beside the
+        # previous cell ends, so the path may have to turn here
+        if dcol:
+            return ((walkable(row - 1, col) and not walkable(row - 1, col - dcol)) or
+                    (walkable(row + 1, col) and not walkable(row + 1, col - dcol)))
+        return ((walkable(row, col - 1) and not walkable(row - drow, col - 1)) or
+                (walkable(row, col + 1) and not walkable(row - drow, col + 1)))
+    
+    def jump_straight(row, col, drow, dcol):
+        # Same as stepping with walkable() and forced() but on flat indices,
+        # as this loop is where the search spends most of its time
+        if not (0 <= row < rows and 0 <= col < cols):
+            return -1
+        index = row * cols + col
+        step = drow * cols + dcol
+        if dcol:
+            side = cols
+            before = row > 0
+            after = row < rows - 1
+            remaining = cols - 1 - col if dcol > 0 else col
+        else:
+            side = 1
+            before = col > 0
+            after = col < cols - 1
+            remaining = rows - 1 - row if drow > 0 else row
+        
+        while not cells[index] & WALL:
+            if index == end:
+                return index
+            if before and not cells[index - side] & WALL and cells[index - side - step] & WALL:
+                return index
+            if after and not cells[index + side] & WALL and cells[index + side - step] & WALL:
+                return index
+            if not remaining:
+                return -1
+            remaining -= 1
+            index += step
+        return -1
+    
+    def jump(row, col, drow, dcol):
+        # Returns the index of the next jump point in the direction or -1
+        if not diagonal:
+            # On a 4-connected grid vertical jumps stop wherever a horizontal
+            # jump would find a jump point
+            if dcol:
+                return jump_straight(row, col, drow, dcol)
+            while walkable(row, col):
+                if ((row == end_row and col == end_col) or forced(row, col, drow, dcol) or
+                        jump_straight(row, col - 1, 0, -1) != -1 or jump_straight(row, col + 1, 0, 1) != -1):
+                    return row * cols + col
+                row += drow
+            return -1
+        
+        if not (drow and dcol):
+            return jump_straight(row, col, drow, dcol)
+        
+        # Diagonal jumps stop wherever one of the two straight jumps would find
+        # a jump point and may only go on when the step does not cut a corner
+        while walkable(row, col):
+            if ((row == end_row and col == end_col) or
+                    jump_straight(row, col + dcol, 0, dcol) != -1 or jump_straight(row + drow, col, drow, 0) != -1):
+                return row * cols + col
+            if not (walkable(row, col + dcol) and walkable(row + drow, col)):
+                return -1
+            row += drow
+            col += dcol
+        return -1
+    
+    def directions(current, parent):
+        # Directions worth jumping in from current, pruned by the direction
+        # it was reached from
+        row, col = divmod(current, cols)
+        if parent == current:
+            return [(neighbor // cols - row, neighbor % cols - col) for neighbor in grid.neighbors(current)]
+        
+        parent_row, parent_col = divmod(parent, cols)
+        drow = _sign(row - parent_row)
+        dcol = _sign(col - parent_col)
+        result = []
+        
+        if not diagonal:
+            if dcol:
+                sides = ((-1, 0), (1, 0))
+            else:
+                sides = ((0, -1), (0, 1))
+            for side_row, side_col in sides:
+                if walkable(row + side_row, col + side_col):
+                    result.append((side_row, side_col))
+            if walkable(row + drow, col + dcol):
+                result.append((drow, dcol))
+        elif drow and dcol:
+            vertical = walkable(row + drow, col)
+            horizontal = walkable(row, col + dcol)
+            if vertical:
+                result.append((drow, 0))
+            if horizontal:
+                result.append((0, dcol))
+            if vertical and horizontal:
+                result.append((drow, dcol))
+        else:
+            # Sides are perpendicular to the direction of the move. A side is
+            # only forced when the cell behind it is blocked, otherwise the
+            # parent reaches it at least as cheaply without passing here.
+            sides = ((-1, 0), (1, 0)) if dcol else ((0, -1), (0, 1))
+            ahead = walkable(row + drow, col + dcol)
+            if ahead:
+                result.append((drow, dcol))
+            for side_row, side_col in sides:
+                if (walkable(row + side_row, col + side_col) and
+                        not walkable(row + side_row - drow, col + side_col - dcol)):
+                    if ahead:
+                        result.append((drow + side_row, dcol + side_col))
+                    result.append((side_row, side_col))
+        return result
+    
+    def distance(a, b):
+        # Jump points are joined by straight or diagonal lines
+        a_row, a_col = divmod(a, cols)
+        b_row, b_col = divmod(b, cols)
+        drow = abs(a_row - b_row)
+        dcol = abs(a_col - b_col)
+        if drow and dcol:
+            return drow * DIAGONAL_COST * step_cost
+        return (drow + dcol) * step_cost
+    
+    expanded = pushes = pops = stale = 0
+    g_score = {start: 0}
+    previous = {start: start}
+    h_score = heuristic_function(grid.position(start), end_position, step_cost)
+    queue = [(h_score, h_score, start)]
+    pushes += 1
+    cells[start] |= IN_QUEUE
+    
+    while queue:
+        current = heappop(queue)[2]
+        pops += 1
+        
+        if cells[current] & VISITED:
+            stale += 1
+            continue
+        
+        cells[current] |= VISITED
+        expanded += 1
+        if observe:
+            yield "visited", grid.position(current)
+        
+        if current == end:
+            path = _fill_jumps(grid, construct_path(previous, current, start))
+            return _result(grid, path, expanded, started, cost=g_score[current], pushes=pushes, pops=pops, stale=stale)
+        
+        row, col = divmod(current, cols)
+        current_g_score = g_score[current]
+        for drow, dcol in directions(current, previous[current]):
+            jump_point = jump(row + drow, col + dcol, drow, dcol)
+            if jump_point == -1 or cells[jump_point] & VISITED:
+                continue
+            
+            temp_g_score = current_g_score + distance(current, jump_point)
+            if temp_g_score < g_score.get(jump_point, float("inf")):
+                g_score[jump_point] = temp_g_score
+                previous[jump_point] = current
+                h_score = heuristic_function(grid.position(jump_point), end_position, step_cost)
+                heappush(queue, (round(temp_g_score + h_score, 9), h_score, jump_point))
+                pushes += 1
+                
+                if not cells[jump_point] & IN_QUEUE:
+                    cells[jump_point] |= IN_QUEUE
+                    if observe:
+                        yield "in_queue", grid.position(jump_point)
+        
+        if observe:
+            yield "step", None
+    return _result(grid, [], expanded, started, pushes=pushes, pops=pops, stale=stale)
+
+def _fill_jumps(grid, jump_points):
+    # Adds the cells on the straight or diagonal line between jump points
+    cols = grid.cols
+    path = jump_points[:1]
+    for current, following in zip(jump_points, jump_points[1:]):
+        row, col = divmod(current, cols)
+        following_row, following_col = divmod(following, cols)
+        drow = _sign(following_row - row)
+        dcol = _sign(following_col - col)
+        while (row, col) != (following_row, following_col):
+            row += drow
+            col += dcol
+            path.append(row * cols + col)
+    return path
+
+# Algorithm Registry ##########################################################
+ALGORITHMS = {
+    "dijkstra": dijkstra,
+    "a_star": a_star,
+    "bidirectional": bidirectional,
+    "bfs": bfs,
+    "dfs": dfs,
+    "jps": jump_point_search,
+}
+
+# The generators behind the searches of ALGORITHMS
+_STEPS = {
+    "dijkstra": _dijkstra,
+    "a_star": _a_star,
+    "bidirectional": _bidirectional,
+    "bfs": _bfs,
+    "dfs": _dfs,
+    "jps": _jump_point_search,
+}
+
+# Extra keyword options are passed on to the search, e.g. heuristic for A*.
+# With a ComponentIndex of the grid as components, queries between cells of
+# different components are answered without searching.
+def find_path(grid, start, end, algorithm="a_star", observer=None, components=None, **options):
+    if algorithm not in ALGORITHMS:
+        raise ValueError("Unknown algorithm: %s" % algorithm)
+    grid = as_grid(grid)
+    _check_positions(grid, start, end)
+    if components is not None and not components.connected(start, end):
+        started = time.perf_counter()
+        grid.clear_search()
+        return _result(grid, [], 0, started, unreachable=True)
+    return ALGORITHMS[algorithm](grid, start, end, observer, **options)
+
+# Returns the search as a generator of (event, position) pairs, see Observers
+# above. The search only runs while the generator is iterated.
+def search_steps(grid, start, end, algorithm="a_star", **options):
+    if algorithm not in _STEPS:
+        raise ValueError("Unknown algorithm: %s" % algorithm)
+    # Checked here as well, the generator only starts on the first next()
+    grid = as_grid(grid)
+    _check_positions(grid, start, end)
+    return _STEPS[algorithm](grid, start, end, True, **options)
@@ -0,0 +1,78 @@
+# Reference answers for the planner tests: a plain Dijkstra written straight
+# from the movement rules in grid.py, without the neighbor masks
+from heapq import heappush, heappop
+import math
+import random
+
+from pathfinding import DIAGONAL_COST, WALL, Grid
+
+def free(grid, row, col):
+    return 0 <= row < grid.rows and 0 <= col < grid.cols and not grid.cells[row * grid.cols + col] & WALL
+
+def steps(grid, row, col):
+    # (row, col, factor) of every cell one step away
+    for drow, dcol in ((-1, 0), (1, 0), (0, -1), (0, 1)):
+        if free(grid, row + drow, col + dcol):
+            yield row + drow, col + dcol, 1
+    if grid.diagonal:
+        for drow in (-1, 1):
+            for dcol in (-1, 1):
+                if free(grid, row + drow, col + dcol) and free(grid, row + drow, col) and free(grid, row, col + dcol):
+                    yield row + drow, col + dcol, DIAGONAL_COST
+
+def shortest_cost(grid, start, end, uniform=False):
+    # Cost of the cheapest path, counting steps instead with uniform=True,
+    # None if there is none
+    distances = {start: 0}
+    queue = [(0, start)]
+    while queue:
+        distance, (row, col) = heappop(queue)
+        if (row, col) == end:
+            return distance
+        if distance > distances[(row, col)]:
+            continue
+        for near_row, near_col, factor in steps(grid, row, col):
+            cost = 1 if uniform else grid.costs[near_row * grid.cols + near_col] * factor
+            if distance + cost < distances.get((near_row, near_col), math.inf):
+                distances[(near_row, near_col)] = distance + cost
+                heappush(queue, (distance + cost, (near_row, near_col)))
+    return None
+
+def path_cost(grid, path):
+    # Checks that every step of the path can be taken and returns its cost
+    cost = 0
+    for (row, col), following in zip(path, path[1:]):
+        moves = {(near_row, near_col): factor for near_row, near_col, factor in steps(grid, row, col)}
+        assert following in moves, "step %r -> %r can't be taken" % ((row, col), following)
+        cost += grid.costs[grid.index(following)] * moves[following]
+    return cost
+
+def random_grid(seed, rows=24, cols=24, diagonal=False, walls=0.25, max_cost=5):
+    rng = random.Random(seed)
+    grid = Grid(rows, cols, diagonal)
+    for row in range(rows):
+        for col in range(cols):
+            if rng.random() < walls:
+                grid.set_wall((row, col))
+            elif max_cost > 1:
+                grid.set_cost((row, col), rng.randint(1, max_cost))
+    return grid, rng
+
+def edit(grid, rng, max_cost=5):
+    # One random change through the grid methods, so listeners see it
+    position = (rng.randrange(grid.rows), rng.randrange(grid.cols))
+    choice = rng.random()
+    if choice < 0.4:
+        grid.set_wall(position)
+    elif choice < 0.7:
+        grid.set_wall(position, False)
+    elif choice < 0.9 and max_cost > 1:
+        grid.set_cost(position, rng.randint(1, max_cost))
+    else:
+        grid.reset(position)
+
+def free_position(grid, rng):
+    while True:
+        position = (rng.randrange(grid.rows), rng.randrange(grid.cols))
+        if not grid.is_wall(position):
+            return position
@@ -0,0 +1,48 @@
+import pytest
+
+from pathfinding import Grid, Workspace, find_path, find_paths
+from pathfinding import batch
+from pathfinding.batch import BATCH_ALGORITHMS
+
+from .helpers import edit, free_position, path_cost, random_grid
+
+@pytest.mark.parametrize("algorithm", BATCH_ALGORITHMS)
+def test_positions_outside_the_grid_are_rejected(algorithm):
+    grid = Grid(3, 3)
+    for start, end in (((0, 0), (0, 3)), ((0, 0), (3, 0)), ((-1, 0), (2, 2)), ((0, 0), (2, -1))):
+        with pytest.raises(ValueError):
+            find_paths(grid, [((0, 0), (2, 2)), (start, end)], algorithm)
+
+def check_batches(grid, rng, workspace, algorithm, batches=30):
+    # The same workspace answers every batch like a single search would,
+    # with edits to the grid between the batches
+    for _ in range(batches):
+        for _ in range(rng.randint(1, 4)):
+            edit(grid, rng)
+        pairs = [(free_position(grid, rng), free_position(grid, rng)) for _ in range(rng.randint(1, 5))]
+        for (start, end), result in zip(pairs, workspace.find_paths(pairs, algorithm)):
+            single = find_path(grid, start, end, algorithm)
+            assert result.found == single.found
+            if result.found:
+                assert result.path[0] == start and result.path[-1] == end
+                if algorithm == "bfs":
+                    path_cost(grid, result.path)
+                    assert len(result.path) == len(single.path)
+                else:
+                    assert path_cost(grid, result.path) == pytest.approx(path_cost(grid, single.path))
+                    assert result.stats["cost"] == pytest.approx(single.stats["cost"])
+
+@pytest.mark.parametrize("algorithm", BATCH_ALGORITHMS)
+@pytest.mark.parametrize("diagonal", [False, True])
+@pytest.mark.parametrize("seed", range(3))
+def test_reused_workspace_matches_find_path(algorithm, diagonal, seed):
+    grid, rng = random_grid(seed, diagonal=diagonal)
+    check_batches(grid, rng, Workspace(grid), algorithm)
+
+@pytest.mark.parametrize("algorithm", BATCH_ALGORITHMS)
+def test_stamps_are_reset_after_the_last_generation(monkeypatch, algorithm):
+    monkeypatch.setattr(batch, "MAX_GENERATION", 3)
+    grid, rng = random_grid(4, diagonal=True)
+    workspace = Workspace(grid)
+    check_batches(grid, rng, workspace, algorithm)
+    assert 1 <= workspace.generation <= 3
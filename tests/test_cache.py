@@ -0,0 +1,38 @@
+import random
+
+from pathfinding import Grid, PathCache, find_path
+
+def test_wall_beside_a_diagonal_step_drops_the_path():
+    grid = Grid(3, 3, diagonal=True)
+    cache = PathCache(grid)
+    assert cache.find_path((0, 0), (2, 2)).path == [(0, 0), (1, 1), (2, 2)]
+    grid.set_wall((1, 0))
+    grid.set_wall((0, 1))
+    assert not cache.find_path((0, 0), (2, 2)).found
+    assert cache.invalidations >= 1
+
+def test_cached_paths_stay_walkable_through_edits():
+    rng = random.Random(17)
+    for diagonal in (False, True):
+        grid = Grid(12, 12, diagonal)
+        cache = PathCache(grid, max_cells=500)
+        # A few pairs asked for again and again, so most queries are hits
+        pairs = [((rng.randrange(12), rng.randrange(12)), (rng.randrange(12), rng.randrange(12)))
+                 for _ in range(4)]
+        for _ in range(300):
+            position = (rng.randrange(12), rng.randrange(12))
+            if rng.random() < 0.7:
+                grid.set_wall(position, rng.random() < 0.6)
+            else:
+                grid.set_cost(position, rng.randint(1, 5))
+            start, end = rng.choice(pairs)
+            cached = cache.find_path(start, end, "dijkstra")
+            fresh = find_path(grid, start, end, "dijkstra")
+            # A cached path may be longer than a new one, but never invalid
+            if cached.found:
+                steps = set(zip(cached.path, cached.path[1:]))
+                for current, following in steps:
+                    assert grid.index(following) in grid.neighbors(grid.index(current))
+            else:
+                assert not fresh.found
+        cache.close()
@@ -0,0 +1,38 @@
+import pytest
+
+from pathfinding import ComponentIndex, Grid, find_path
+
+from .helpers import edit, free_position, random_grid, shortest_cost
+
+@pytest.mark.parametrize("diagonal", [False, True])
+@pytest.mark.parametrize("seed", range(4))
+def test_connected_through_edits(diagonal, seed):
+    # Walls near the percolation threshold split and join components often
+    grid, rng = random_grid(seed, diagonal=diagonal, walls=0.4, max_cost=1)
+    components = ComponentIndex(grid)
+    for query in range(80):
+        # Mostly a few changes applied one by one, now and then enough of
+        # them for a rebuild
+        for _ in range(40 if query % 20 == 19 else rng.randint(1, 3)):
+            edit(grid, rng, max_cost=1)
+        for _ in range(5):
+            start = free_position(grid, rng)
+            end = free_position(grid, rng)
+            reachable = shortest_cost(grid, start, end, uniform=True) is not None
+            assert components.connected(start, end) == reachable
+            assert (components.component(start) == components.component(end)) == reachable
+    
+    result = find_path(grid, start, end, "bfs", components=components)
+    assert result.found == reachable
+    components.close()
+
+def test_positions_outside_the_grid_are_rejected():
+    components = ComponentIndex(Grid(3, 3))
+    for position in ((0, 3), (3, 0), (-1, 1)):
+        with pytest.raises(ValueError):
+            components.component(position)
+        with pytest.raises(ValueError):
+            components.connected((0, 0), position)
+        with pytest.raises(ValueError):
+            components.connected(position, (0, 0))
+    components.close()
@@ -0,0 +1,51 @@
+import pytest
+
+from pathfinding import DStarLite, Grid
+
+from .helpers import edit, free_position, path_cost, random_grid, shortest_cost
+
+@pytest.mark.parametrize("diagonal", [False, True])
+@pytest.mark.parametrize("seed", range(4))
+def test_moving_agent_through_edits(diagonal, seed):
+    grid, rng = random_grid(seed, diagonal=diagonal, walls=0.35)
+    start = free_position(grid, rng)
+    planner = None
+    for _ in range(80):
+        if planner is None:
+            end = free_position(grid, rng)
+            planner = DStarLite(grid, start, end)
+        for _ in range(rng.randint(1, 4)):
+            edit(grid, rng)
+        # The agent's own cell stays free
+        grid.set_wall(start, False)
+        result = planner.find_path(start)
+        best = shortest_cost(grid, start, end)
+        assert result.found == (best is not None)
+        if result.found:
+            assert result.path[0] == start and result.path[-1] == end
+            assert path_cost(grid, result.path) == pytest.approx(best)
+        
+        # The agent sometimes takes the first step of the repaired path, and
+        # heads for a new end once it arrived or now and then when stuck
+        if result.found and len(result.path) > 1:
+            if rng.random() < 0.3:
+                start = result.path[1]
+        elif result.found or rng.random() < 0.2:
+            planner.close()
+            planner = None
+    if planner is not None:
+        planner.close()
+
+@pytest.mark.parametrize("start, end", [((0, 0), (0, 3)), ((0, 0), (3, 0)), ((-1, 0), (2, 2))])
+def test_positions_outside_the_grid_are_rejected(start, end):
+    with pytest.raises(ValueError):
+        DStarLite(Grid(3, 3), start, end)
+
+def test_moved_start_outside_the_grid_is_rejected():
+    planner = DStarLite(Grid(3, 3), (0, 0), (2, 2))
+    for start in ((0, 3), (-1, 1)):
+        with pytest.raises(ValueError):
+            planner.find_path(start)
+    # A rejected start leaves the planner as it was
+    assert planner.find_path().path[0] == (0, 0)
+    planner.close()
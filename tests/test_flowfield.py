@@ -0,0 +1,55 @@
+import pytest
+
+from pathfinding import FlowField, Grid
+from pathfinding.flowfield import VECTOR_FRONTIER
+
+from .helpers import path_cost, random_grid, shortest_cost
+
+@pytest.mark.parametrize("use_numpy", [False, True])
+@pytest.mark.parametrize("diagonal", [False, True])
+@pytest.mark.parametrize("seed", range(3))
+def test_distances_and_paths(use_numpy, diagonal, seed):
+    grid, rng = random_grid(seed, rows=16, cols=16, diagonal=diagonal, walls=0.3, max_cost=1)
+    goal = (rng.randrange(grid.rows), rng.randrange(grid.cols))
+    grid.set_wall(goal, False)
+    field = FlowField(grid, goal, use_numpy=use_numpy)
+    for row in range(grid.rows):
+        for col in range(grid.cols):
+            position = (row, col)
+            steps = shortest_cost(grid, position, goal, uniform=True)
+            if grid.is_wall(position) or steps is None:
+                # Walls keep -1 too, nothing steps into them
+                if position != goal:
+                    assert field.distance(position) == -1
+                    assert field.path(position) == []
+                continue
+            
+            assert field.distance(position) == steps
+            path = field.path(position)
+            assert path[0] == position and path[-1] == goal
+            assert len(path) == steps + 1
+            path_cost(grid, path)
+            assert field.next_step(position) == (path[1] if steps else None)
+
+def test_numpy_matches_arrays():
+    np = pytest.importorskip("numpy")
+    # Wide open enough for frontiers well past VECTOR_FRONTIER
+    for diagonal in (False, True):
+        grid, rng = random_grid(7, rows=120, cols=120, diagonal=diagonal, walls=0.1, max_cost=1)
+        goal = (60, 60)
+        grid.set_wall(goal, False)
+        vector = FlowField(grid, goal)
+        cells = FlowField(grid, goal, use_numpy=False)
+        assert vector.use_numpy and not cells.use_numpy
+        assert np.count_nonzero(vector.distances == 40) > VECTOR_FRONTIER
+        assert vector.distances.tolist() == cells.distances.tolist()
+        assert vector.flow.tolist() == list(cells.flow)
+
+def test_positions_outside_the_grid_are_rejected():
+    with pytest.raises(ValueError):
+        FlowField(Grid(3, 3), (0, 3))
+    field = FlowField(Grid(3, 3), (0, 0))
+    for position in ((0, 3), (3, 0), (-1, 1)):
+        for lookup in (field.distance, field.next_step, field.path):
+            with pytest.raises(ValueError):
+                lookup(position)
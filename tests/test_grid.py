@@ -0,0 +1,39 @@
+import pytest
+
+from pathfinding import WALL
+
+from .helpers import edit, random_grid
+
+@pytest.mark.parametrize("diagonal", [False, True])
+@pytest.mark.parametrize("seed", range(4))
+def test_incremental_masks_match_a_rebuild(diagonal, seed):
+    grid, rng = random_grid(seed, diagonal=diagonal)
+    grid.update_masks()
+    for _ in range(200):
+        # Few enough changes that update_masks() patches the masks in place
+        for _ in range(rng.randint(1, 3)):
+            edit(grid, rng)
+        if rng.random() < 0.3:
+            index = rng.randrange(grid.size)
+            grid.cells[index] ^= WALL
+            grid.walls_changed(index)
+        assert len(grid.dirty) <= grid.size // 64
+        grid.update_masks()
+        masks = bytes(grid.masks)
+        grid._build_masks()
+        assert masks == bytes(grid.masks)
+
+def test_min_cost_follows_cost_changes():
+    grid, rng = random_grid(1, rows=4, cols=4, walls=0, max_cost=1)
+    grid.set_cells(bytes(grid.size), [3] * grid.size)
+    assert grid.min_cost == 3
+    grid.set_cost((1, 1), 2)
+    assert grid.min_cost == 2
+    grid.set_cost((1, 1), 4)
+    assert grid.min_cost == 3
+    grid.reset((2, 2))
+    assert grid.min_cost == 1
+    grid.set_cells(bytes(grid.size), [5] * grid.size)
+    assert grid.min_cost == 5
+    grid.clear()
+    assert grid.min_cost == 1
@@ -0,0 +1,47 @@
+import pytest
+
+from pathfinding import Grid, HierarchicalPathfinder
+
+from .helpers import edit, free_position, path_cost, random_grid, shortest_cost
+
+@pytest.mark.parametrize("diagonal", [False, True])
+@pytest.mark.parametrize("seed", range(4))
+def test_paths_through_edits(diagonal, seed):
+    grid, rng = random_grid(seed, diagonal=diagonal)
+    pathfinder = HierarchicalPathfinder(grid, cluster_size=6)
+    for _ in range(40):
+        for _ in range(rng.randint(1, 4)):
+            edit(grid, rng)
+        start = free_position(grid, rng)
+        end = free_position(grid, rng)
+        result = pathfinder.find_path(start, end)
+        best = shortest_cost(grid, start, end)
+        # Paths are walkable and found whenever one exists, not always the
+        # cheapest one
+        assert result.found == (best is not None)
+        if result.found:
+            assert result.path[0] == start and result.path[-1] == end
+            cost = path_cost(grid, result.path)
+            assert cost == pytest.approx(result.stats.get("cost", 0))
+            assert cost >= best - 1e-9
+    pathfinder.close()
+
+def test_positions_outside_the_grid_are_rejected():
+    pathfinder = HierarchicalPathfinder(Grid(3, 3), cluster_size=2)
+    for start, end in (((0, 0), (0, 3)), ((0, 0), (3, 0)), ((-1, 0), (2, 2))):
+        with pytest.raises(ValueError):
+            pathfinder.find_path(start, end)
+    pathfinder.close()
+
+@pytest.mark.parametrize("shape", [(12, 2), (2, 12), (9, 3)])
+def test_costs_on_narrow_diagonal_grids(shape):
+    # One cell offsets are ambiguous here, e.g. down-left is +1 on 2 columns
+    grid, rng = random_grid(5, *shape, diagonal=True, walls=0.1)
+    pathfinder = HierarchicalPathfinder(grid, cluster_size=2)
+    for _ in range(30):
+        start = free_position(grid, rng)
+        end = free_position(grid, rng)
+        result = pathfinder.find_path(start, end)
+        if result.found:
+            assert path_cost(grid, result.path) == pytest.approx(result.stats["cost"])
+    pathfinder.close()
@@ -0,0 +1,17 @@
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def test_import_loads_no_heavy_modules():
+    # Run in a fresh interpreter, the other tests import NumPy
+    code = ("import sys, pathfinding; "
+            "print(sorted(name for name in ('numpy', 'multiprocessing', 'concurrent.futures') if name in sys.modules))")
+    output = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True).stdout
+    assert output.strip() == "[]"
+
+def test_parallel_names_import_on_use():
+    from pathfinding import ParallelPathfinder, find_paths_parallel
+    assert ParallelPathfinder.__module__ == "pathfinding.parallel"
+    assert callable(find_paths_parallel)
@@ -0,0 +1,34 @@
+import pytest
+
+from pathfinding import Landmarks, a_star
+
+from .helpers import edit, free_position, path_cost, random_grid, shortest_cost
+
+@pytest.mark.parametrize("diagonal", [False, True])
+@pytest.mark.parametrize("max_cost", [1, 5])
+def test_optimal_paths_through_edits(diagonal, max_cost):
+    grid, rng = random_grid(7, diagonal=diagonal, max_cost=max_cost)
+    landmarks = Landmarks(grid, count=4, seed=1)
+    for _ in range(40):
+        for _ in range(rng.randint(1, 4)):
+            edit(grid, rng, max_cost=max_cost)
+        start = free_position(grid, rng)
+        end = free_position(grid, rng)
+        result = a_star(grid, start, end, heuristic=landmarks)
+        best = shortest_cost(grid, start, end)
+        assert result.found == (best is not None)
+        if result.found:
+            assert path_cost(grid, result.path) == pytest.approx(best)
+    landmarks.close()
+
+def test_saved_tables(tmp_path):
+    grid, rng = random_grid(3, diagonal=True)
+    landmarks = Landmarks(grid, count=4, seed=2)
+    landmarks.save(tmp_path / "grid.alt")
+    loaded = Landmarks.load(tmp_path / "grid.alt", grid)
+    assert loaded.landmarks == landmarks.landmarks
+    assert loaded.forward == landmarks.forward and loaded.backward == landmarks.backward
+    
+    grid.set_cost(free_position(grid, rng), 9)
+    with pytest.raises(ValueError):
+        Landmarks.load(tmp_path / "grid.alt", grid)
@@ -0,0 +1,79 @@
+import pytest
+
+from pathfinding import ALGORITHMS, Grid, find_path, generate_maze, load_map, load_movingai, save_map, save_movingai
+
+@pytest.fixture
+def maze():
+    grid = Grid(21, 31, diagonal=True)
+    generate_maze(grid, "kruskal", seed=5)
+    return grid
+
+def test_round_trip(tmp_path, maze):
+    path = tmp_path / "maze.pfmap"
+    maze.set_cost((1, 1), 3)
+    save_map(maze, path)
+    grid = load_map(path)
+    assert (grid.rows, grid.cols, grid.diagonal) == (21, 31, True)
+    assert grid.cells == maze.cells and grid.costs == maze.costs and grid.masks == maze.masks
+
+def test_mapped_grid_runs_every_search(tmp_path, maze):
+    path = tmp_path / "maze.pfmap"
+    save_map(maze, path)
+    grid = load_map(path, mapped=True)
+    for algorithm in ALGORITHMS:
+        assert find_path(grid, (1, 1), (19, 29), algorithm).path == find_path(maze, (1, 1), (19, 29), algorithm).path
+
+def test_mapped_grid_clears_the_last_search(tmp_path, maze):
+    path = tmp_path / "maze.pfmap"
+    save_map(maze, path)
+    grid = load_map(path, mapped=True)
+    assert find_path(grid, (1, 1), (19, 29)).found
+    assert any(grid.is_visited((row, col)) for row in range(grid.rows) for col in range(grid.cols))
+    grid.clear_search()
+    assert bytes(grid.cells) == bytes(maze.cells)
+
+def test_mapped_grid_edits_leave_the_file_alone(tmp_path, maze):
+    path = tmp_path / "maze.pfmap"
+    save_map(maze, path)
+    saved = path.read_bytes()
+    grid = load_map(path, mapped=True)
+    grid.set_wall((1, 2))
+    grid.set_wall((2, 1))
+    assert not find_path(grid, (1, 1), (19, 29)).found
+    assert path.read_bytes() == saved
+    
+    save_map(grid, path)
+    assert load_map(path).is_wall((1, 2))
+
+def test_buffers_must_be_writable_and_sized():
+    with pytest.raises(ValueError):
+        Grid.from_buffers(2, 2, bytes(4), bytearray(4))
+    with pytest.raises(ValueError):
+        Grid.from_buffers(2, 2, bytearray(3), bytearray(4))
+
+def test_not_a_map_file(tmp_path):
+    path = tmp_path / "junk.pfmap"
+    path.write_bytes(b"junk" * 10)
+    with pytest.raises(ValueError):
+        load_map(path)
+
+@pytest.mark.parametrize("diagonal", [False, True])
+def test_movingai_round_trip_keeps_the_connectivity(tmp_path, maze, diagonal):
+    path = tmp_path / "maze.map"
+    maze = Grid.from_rows(maze.to_rows(), diagonal=diagonal)
+    save_movingai(maze, path)
+    grid = load_movingai(path, diagonal)
+    assert grid.diagonal == diagonal
+    assert grid.to_rows() == maze.to_rows()
+
+def test_movingai_terrain_characters(tmp_path):
+    path = tmp_path / "terrain.map"
+    path.write_text("type octile\nheight 2\nwidth 4\nmap\n.@TG\nSOW.\n")
+    assert load_movingai(path, False).to_rows() == [[0, 1, 1, 0], [0, 1, 1, 0]]
+
+@pytest.mark.parametrize("text", ["type octile\nheight 2\nwidth 4\nmap\n....\n", "type octile\nwidth 4\nmap\n....\n", "type octile\n"])
+def test_malformed_movingai_maps(tmp_path, text):
+    path = tmp_path / "bad.map"
+    path.write_text(text)
+    with pytest.raises(ValueError):
+        load_movingai(path, True)
@@ -0,0 +1,35 @@
+from collections import deque
+
+import pytest
+
+from pathfinding import GENERATORS, WALL, Grid, generate_maze
+
+def reachable(grid, start):
+    seen = {start}
+    queue = deque([start])
+    while queue:
+        for neighbor in grid.neighbors(queue.popleft()):
+            if neighbor not in seen:
+                seen.add(neighbor)
+                queue.append(neighbor)
+    return seen
+
+@pytest.mark.parametrize("generator", ["recursive_division", "prim", "kruskal"])
+@pytest.mark.parametrize("use_numpy", [True, False])
+@pytest.mark.parametrize("shape", [(3, 3), (3, 9), (21, 31), (40, 61)])
+def test_mazes_are_perfect(generator, use_numpy, shape):
+    grid = Grid(*shape)
+    generate_maze(grid, generator, seed=3, use_numpy=use_numpy)
+    rooms = ((grid.rows - 1) // 2) * ((grid.cols - 1) // 2)
+    free = [index for index in range(grid.size) if not grid.cells[index] & WALL]
+    # Every room and one passage less than rooms, all connected: a tree
+    assert len(free) == 2 * rooms - 1
+    assert len(reachable(grid, free[0])) == len(free)
+
+@pytest.mark.parametrize("generator", sorted(GENERATORS))
+def test_same_seed_same_map(generator):
+    first = Grid(31, 41)
+    second = Grid(31, 41)
+    generate_maze(first, generator, seed=11)
+    generate_maze(second, generator, seed=11)
+    assert first.cells == second.cells and first.costs == second.costs
@@ -0,0 +1,32 @@
+import pytest
+
+from pathfinding import ParallelPathfinder, find_paths
+from pathfinding.batch import BATCH_ALGORITHMS
+
+from .helpers import free_position, random_grid
+
+def test_positions_outside_the_grid_are_rejected():
+    grid, rng = random_grid(1, rows=6, cols=6)
+    with ParallelPathfinder(grid, workers=1) as pathfinder:
+        with pytest.raises(ValueError):
+            pathfinder.find_paths([((0, 0), (5, 5)), ((0, 0), (0, 6))])
+
+@pytest.mark.parametrize("diagonal", [False, True])
+def test_same_results_as_serial_batches(diagonal):
+    grid, rng = random_grid(2, diagonal=diagonal)
+    # Small chunks so that every batch is split across the workers
+    with ParallelPathfinder(grid, workers=2, chunk_size=3) as pathfinder:
+        for _ in range(4):
+            pairs = [(free_position(grid, rng), free_position(grid, rng)) for _ in range(20)]
+            for algorithm in BATCH_ALGORITHMS:
+                serial = find_paths(grid, pairs, algorithm)
+                parallel = pathfinder.find_paths(pairs, algorithm)
+                assert [result.path for result in parallel] == [result.path for result in serial]
+            
+            # The workers only see these once the grid is published again
+            for _ in range(10):
+                position = (rng.randrange(grid.rows), rng.randrange(grid.cols))
+                if rng.random() < 0.5:
+                    grid.set_wall(position, not grid.is_wall(position))
+                else:
+                    grid.set_cost(position, rng.randint(1, 5))
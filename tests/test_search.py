@@ -0,0 +1,150 @@
+import pytest
+
+from pathfinding import ALGORITHMS, HEURISTICS, Grid, find_path, iddfs, search_steps
+
+from .helpers import edit, free_position, path_cost, random_grid, shortest_cost
+
+@pytest.mark.parametrize("algorithm", sorted(ALGORITHMS))
+def test_positions_outside_the_grid_are_rejected(algorithm):
+    grid = Grid(3, 3)
+    for start, end in (((0, 0), (0, 3)), ((0, 0), (3, 0)), ((-1, 0), (2, 2)), ((0, 0), (2, -1))):
+        with pytest.raises(ValueError):
+            find_path(grid, start, end, algorithm)
+        with pytest.raises(ValueError):
+            search_steps(grid, start, end, algorithm)
+
+def test_corner_cells_are_in_bounds():
+    result = find_path(Grid(3, 3), (0, 0), (2, 2))
+    assert result.found
+    assert result.path[0] == (0, 0) and result.path[-1] == (2, 2)
+
+@pytest.mark.parametrize("diagonal", [False, True])
+@pytest.mark.parametrize("seed", range(4))
+def test_jump_point_search_through_edits(diagonal, seed):
+    grid, rng = random_grid(seed, diagonal=diagonal, max_cost=1)
+    for _ in range(60):
+        for _ in range(rng.randint(1, 4)):
+            edit(grid, rng, max_cost=1)
+        start = free_position(grid, rng)
+        end = free_position(grid, rng)
+        result = find_path(grid, start, end, "jps")
+        best = shortest_cost(grid, start, end)
+        assert result.found == (best is not None)
+        if result.found:
+            assert result.path[0] == start and result.path[-1] == end
+            assert path_cost(grid, result.path) == pytest.approx(best)
+
+@pytest.mark.parametrize("diagonal", [False, True])
+@pytest.mark.parametrize("seed", range(4))
+def test_dijkstra_costs(diagonal, seed):
+    grid, rng = random_grid(seed, diagonal=diagonal)
+    for _ in range(40):
+        edit(grid, rng)
+        start = free_position(grid, rng)
+        end = free_position(grid, rng)
+        result = find_path(grid, start, end, "dijkstra")
+        best = shortest_cost(grid, start, end)
+        assert result.found == (best is not None)
+        stats = result.stats
+        if result.found:
+            assert result.path[0] == start and result.path[-1] == end
+            assert path_cost(grid, result.path) == pytest.approx(best)
+            assert stats["cost"] == pytest.approx(best)
+            # The end is popped but not expanded
+            assert stats["pops"] - stats["stale"] == stats["expanded"] + 1
+            assert stats["pops"] <= stats["pushes"]
+        else:
+            assert stats["pops"] == stats["pushes"]
+            assert stats["pops"] - stats["stale"] == stats["expanded"]
+
+# Manhattan distance overestimates diagonal steps, the others never do
+ADMISSIBLE = [(False, name) for name in sorted(HEURISTICS)] + \
+             [(True, name) for name in sorted(HEURISTICS) if name != "manhattan"]
+
+@pytest.mark.parametrize("diagonal, heuristic", ADMISSIBLE)
+@pytest.mark.parametrize("seed", range(3))
+def test_a_star_costs(diagonal, heuristic, seed):
+    grid, rng = random_grid(seed, diagonal=diagonal)
+    for _ in range(40):
+        edit(grid, rng)
+        start = free_position(grid, rng)
+        end = free_position(grid, rng)
+        result = find_path(grid, start, end, "a_star", heuristic=heuristic)
+        best = shortest_cost(grid, start, end)
+        assert result.found == (best is not None)
+        stats = result.stats
+        assert stats["pops"] - stats["stale"] == stats["expanded"]
+        if result.found:
+            assert result.path[0] == start and result.path[-1] == end
+            assert path_cost(grid, result.path) == pytest.approx(best)
+            assert stats["cost"] == pytest.approx(best)
+            assert stats["pops"] <= stats["pushes"]
+        else:
+            assert stats["pops"] == stats["pushes"]
+
+@pytest.mark.parametrize("seed", range(3))
+def test_a_star_with_manhattan_on_diagonal_grids(seed):
+    # Not always the cheapest path, but still a walkable one when one exists
+    grid, rng = random_grid(seed, diagonal=True)
+    for _ in range(40):
+        edit(grid, rng)
+        start = free_position(grid, rng)
+        end = free_position(grid, rng)
+        result = find_path(grid, start, end, "a_star", heuristic="manhattan")
+        best = shortest_cost(grid, start, end)
+        assert result.found == (best is not None)
+        if result.found:
+            assert path_cost(grid, result.path) >= best - 1e-9
+
+@pytest.mark.parametrize("algorithm", ["bfs", "bidirectional", "iddfs"])
+@pytest.mark.parametrize("diagonal", [False, True])
+@pytest.mark.parametrize("seed", range(3))
+def test_fewest_steps(algorithm, diagonal, seed):
+    # Small grids, iterative deepening repeats its search once per step
+    grid, rng = random_grid(seed, rows=9, cols=9, diagonal=diagonal, walls=0.3, max_cost=1)
+    for _ in range(30):
+        edit(grid, rng, max_cost=1)
+        start = free_position(grid, rng)
+        end = free_position(grid, rng)
+        # Iterative deepening isn't one of ALGORITHMS, it's called directly
+        if algorithm == "iddfs":
+            result = iddfs(grid, start, end)
+        else:
+            result = find_path(grid, start, end, algorithm)
+        steps = shortest_cost(grid, start, end, uniform=True)
+        assert result.found == (steps is not None)
+        if result.found:
+            assert result.path[0] == start and result.path[-1] == end
+            assert len(result.path) == steps + 1
+            path_cost(grid, result.path)
+
+def test_dfs_follows_a_long_corridor():
+    # A single serpentine corridor far longer than the recursion limit
+    grid = Grid(101, 200)
+    for row in range(1, grid.rows, 2):
+        for col in range(grid.cols):
+            grid.set_wall((row, col))
+        grid.set_wall((row, grid.cols - 1 if row % 4 == 1 else 0), False)
+    end = (grid.rows - 1, grid.cols - 1 if grid.rows % 4 == 1 else 0)
+    result = find_path(grid, (0, 0), end, "dfs")
+    assert result.found
+    assert result.path[0] == (0, 0) and result.path[-1] == end
+    assert len(result.path) == shortest_cost(grid, (0, 0), end, uniform=True) + 1
+    path_cost(grid, result.path)
+
+def test_max_depth_cuts_off_the_search():
+    grid = Grid(5, 5)
+    result = find_path(grid, (0, 0), (4, 4), "dfs", max_depth=3)
+    assert not result.found and result.stats["cut_off"]
+    result = iddfs(grid, (0, 0), (4, 4), max_depth=7)
+    assert not result.found and result.stats["iterations"] == 8
+    result = iddfs(grid, (0, 0), (4, 4), max_depth=8)
+    assert result.found and len(result.path) == 9
+    
+    # Walled in, the whole region fits within the limit
+    grid.set_wall((0, 2))
+    grid.set_wall((1, 2))
+    grid.set_wall((2, 0))
+    grid.set_wall((2, 1))
+    result = find_path(grid, (0, 0), (4, 4), "dfs", max_depth=10)
+    assert not result.found and not result.stats["cut_off"]